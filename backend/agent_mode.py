@@ -3,18 +3,208 @@ import json
 import re
 import logging
 import time
+import hashlib
+import functools
+import asyncio
+import orjson
+from collections import deque
 from typing import Dict, Any, List, Optional, Tuple, AsyncGenerator
 from search_tools import WebSearchManager, SearchError
 from browser_use_integration import browser_automation
+from gmail_service import email_service
 
 logger = logging.getLogger(__name__)
 
+# RE2 matches in linear time, which keeps lazy DOTALL scans of untrusted LLM output from backtracking
+try:
+    import re2 as _tag_re_engine
+except ImportError:
+    _tag_re_engine = re
+
+# Per-tag patterns for the structured response tags; each tag is found independently, even inside another
+_THINK_RE = _tag_re_engine.compile(r'(?s)<think>(.*?)</think>')
+_TOOL_RE = _tag_re_engine.compile(r'(?s)<tool>(.*?)</tool>')
+_ANSWER_RE = _tag_re_engine.compile(r'(?s)<answer>(.*?)</answer>')
+# Think and tool blocks are stripped in one scan
+_INTERNAL_TAGS_RE = re.compile(r'<think>.*?</think>|<tool>.*?</tool>', re.DOTALL)
+_EXCESS_NEWLINES_RE = re.compile(r'\n\s*\n\s*\n')
+
+# Repairs for models that echo the prompt's escaped double braces in tool JSON
+_DOUBLE_BRACE_ARGS_RE = re.compile(r'"args":\s*\{\{')
+_DOUBLE_BRACE_CLOSE_RE = re.compile(r'\}\}\s*\}')
+
+# Openings that mark an untagged response as a final answer
+_ANSWER_LIKE_RES = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for pattern in (
+        r'Here are the summaries.*?:',
+        r'Based on.*?research.*?:',
+        r'I found.*?case studies.*?:',
+        r'The following.*?results.*?:',
+        r'\d+\.\s*\*\*.*?\*\*',  # Numbered lists with bold titles
+    )
+]
+
+# site: filter and quoted company name in a case study lookup query
+_SITE_FILTER_RE = re.compile(r'site:([^\s]+)')
+_QUOTED_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Case study result URLs must contain a case study path and must not be a blog, news or press page
+_CASE_STUDY_URL_RE = re.compile(r'/case-studies/|/customer-stories/|/success-stories/|case-study|customer-story')
+_EXCLUDED_URL_RE = re.compile(r'/blog/|/news/|/press/|/articles/|blog\.')
+
+# Company name patterns tried against a case study page title
+_COMPANY_TITLE_RES = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'^([^:]+):',  # "Company Name: Title"
+        r'([^-]+)-',  # "Company Name - Title"
+        r'(\w+(?:\s+\w+){0,2})\s+(?:Case Study|Success Story|Customer Story)',  # "Company Name Case Study"
+    )
+]
+
+# Class names of the containers that hold a case study page's main content
+_CASE_STUDY_SECTION_CLASS_RE = re.compile(r'case-study|content|main|story')
+
+# Heading tags that start and end a case study section
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Key metrics quoted in case study text, found in one scan; metrics are reported grouped in _METRIC_KINDS order
+_METRIC_RE = re.compile(
+    r'(?P<percent>\d+%)\s+(?:increase|improvement|growth|boost)'
+    r'|(?P<multiple>\d+x)\s+(?:increase|improvement|growth|boost)'
+    r'|(?P<money>\$[\d,]+(?:\.\d+)?[kKmMbB]?)\s+(?:revenue|sales|savings)'
+    r'|(?P<count>\d+(?:,\d+)*)\s+(?:customers|users|leads|conversions)',
+    re.IGNORECASE
+)
+_METRIC_KINDS = ('percent', 'multiple', 'money', 'count')
+
+
+@functools.lru_cache(maxsize=128)
+def _keyword_class_re(keyword: str) -> re.Pattern:
+    """Case-insensitive class-name pattern for a section keyword, compiled once per keyword"""
+    return re.compile(keyword, re.IGNORECASE)
+
+
+# Each _ANSWER_LIKE_RES pattern needs one of these literals, so responses without any skip those scans
+_ANSWER_HINT_RE = re.compile(r'here are the summaries|based on|i found|the following|\*\*', re.IGNORECASE)
+
+# Words in the user's request that suggest the workspace file listing is worth including in the prompt
+_WORKSPACE_INTENT_RE = re.compile(
+    r"file|read|show me|what's in|workspace|save|write|list|\.md|case stud|research|email|knowledge|folder|document",
+    re.IGNORECASE
+)
+
+# Tool results that are returned as text without going through the JSON encoder
+_ATOMIC_TOOL_RESULT_TYPES = (int, float, bool, type(None))
+
+# Characters dropped from an email subject when it's used in a draft filename (\w keeps letters, digits and _)
+_SUBJECT_UNSAFE_RE = re.compile(r'[^\w -]+')
+
+# File context used when the request doesn't look workspace-related
+_FILE_CONTEXT_SKIPPED = "\nCURRENT WORKSPACE: Use workspace_overview or file_list to see available files if needed.\n"
+
+# SSE frames are yielded as pre-encoded bytes; constant frames are serialized once
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_FRAME_FORMAT = _SSE_PREFIX + b"%b" + _SSE_SUFFIX
+
+
+def _sse_frame(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload as an SSE data frame in a single bytes allocation"""
+    return _SSE_FRAME_FORMAT % orjson.dumps(payload)
+
+
+_AGENT_STARTED_FRAME = _sse_frame({'type': 'status', 'message': 'Agent started', 'step': 0})
+_TOOL_LIMIT_FRAME = _sse_frame({'type': 'error', 'message': 'Tool call limit reached'})
+_DUPLICATE_TOOL_FRAME = _sse_frame({'type': 'error', 'message': 'Duplicate tool call detected'})
+_MAX_STEPS_MESSAGE = 'I have reached my maximum number of research steps. Here is what I found so far.'
+# Only the step number varies, so the card is a bytes %-template
+_MAX_STEPS_CARD_TEMPLATE = (
+    _SSE_PREFIX
+    + orjson.dumps({'type': 'thought_card', 'card_type': 'final_answer', 'step': '%d', 'content': _MAX_STEPS_MESSAGE, 'icon': '🎯', 'title': 'Final Answer'})
+    + _SSE_SUFFIX
+).replace(b'"%d"', b'%d')
+
+_FILE_CONTEXT_FOOTER = (
+    "\nTo access files, use:\n"
+    "- file_read: Read specific files by path\n"
+    "- file_search: Find files by name (e.g., 'bloomreach', 'case study')\n"
+    "- file_write: Save new content to files\n"
+    "- file_list: List contents of specific directories (use path='' for root overview)\n"
+    "\nTIP: Start with file_list path='' to see the full workspace structure efficiently!\n"
+)
+
 class AgentMode:
     """
     Agent Mode implementation with step-bounded tool loops
     Based on research-agent-lesson patterns
     """
     
+    # Key workspace directories, shown by workspace_overview and the system prompt file context
+    WORKSPACE_DIRECTORIES = (
+        ("", "Root"),
+        ("knowledge_base", "Knowledge Base"),
+        ("output", "Output"),
+        ("output/case_studies", "Case Studies"),
+        ("output/emails", "Email Drafts"),
+        ("output/slides", "Slides"),
+        ("output/context", "Context Files"),
+        ("logs", "Logs")
+    )
+    
+    # Seconds a cached file context is reused before the directory mtimes are checked again
+    FILE_CONTEXT_TTL = 5.0
+    
+    # Read-only tools whose results are reused for repeated calls (TTL in seconds)
+    TOOL_CACHE_TTLS = {
+        "web_search": 300,
+        "case_study_lookup": 3600,
+        "file_read": 3600,  # Also keyed on file mtime
+    }
+    TOOL_CACHE_MAX_ENTRIES = 256
+    
+    # Side-effect-free tools that may start while the model is still streaming its response
+    SPECULATIVE_TOOLS = frozenset({
+        "web_search",
+        "case_study_lookup",
+        "file_read",
+        "file_list",
+        "file_search",
+        "workspace_overview",
+    })
+    
+    # Seconds a tool may run before it's cancelled, so one stuck tool can't stall the agent loop
+    TOOL_TIMEOUTS = {
+        "browser_automate": 120,
+        "apollo_process": 180,
+        "case_study_lookup": 90,
+        "web_search": 30,
+        "email_write": 30,
+        "file_read": 10,
+        "file_edit": 10,
+        "file_list": 10,
+        "file_search": 10,
+        "workspace_overview": 10,
+    }
+    DEFAULT_TOOL_TIMEOUT = 60
+    
+    # Tool results are trimmed to this length once the model has responded to them
+    CONSUMED_TOOL_RESULT_MAX_CHARS = 2000
+    
+    # Messages after the system prompt that are sent to the model; older turns are dropped
+    MAX_HISTORY_MESSAGES = 40
+    
+    # Upper bound on tool calls from one response that run at the same time
+    MAX_CONCURRENT_TOOLS = 4
+    
+    # Upper bound on case study pages fetched at the same time
+    MAX_CONCURRENT_FETCHES = 5
+    # Pooled connections per host, so fetches to one site stay polite while other hosts proceed
+    MAX_FETCHES_PER_HOST = 2
+    # Case study search queries kept in flight at once while earlier ones are checked for hits
+    CASE_STUDY_SEARCHES_IN_FLIGHT = 2
+    
     def __init__(self, web_search_manager: WebSearchManager, file_system_tools=None, max_steps: int = 3):
         self.web_search_manager = web_search_manager
         self.file_system_tools = file_system_tools
@@ -33,11 +223,29 @@ class AgentMode:
             "email_write": self.email_write_tool,
         }
         
-    async def get_system_prompt(self) -> str:
+        # The prompt only varies by file listing, so build the static part (and its separator) once
+        self._static_prompt = self._build_static_prompt() + "\n"
+        self._file_context_cache: Optional[Tuple[Any, float, str]] = None  # (workspace mtime key, checked at, file context)
+        self._tool_semaphore = None  # Created on first tool run, inside the serving event loop
+        self._fetch_semaphore = None  # Created on first page fetch, inside the serving event loop
+        self._http_session = None  # Shared aiohttp session, created on first page fetch
+        self._tool_cache: Dict[str, Tuple[float, Any]] = {}  # cache key -> (expiry time, raw result)
+        self.thought_process_cap = 64  # Max thought entries kept per agent run
+        
+    async def get_system_prompt(self, messages: Optional[List[Dict[str, Any]]] = None) -> str:
         """Get the system prompt for Agent Mode with current file listings"""
-        # Get current file listings for intelligent file references
-        file_context = await self._get_file_context()
+        # Get current file listings for intelligent file references, unless the request clearly doesn't involve files
+        if messages is not None and not self._needs_file_context(messages):
+            file_context = _FILE_CONTEXT_SKIPPED
+        else:
+            file_context = await self._get_cached_file_context()
         
+        # Static instructions first and the changing file listing last, so the provider's prompt-prefix cache
+        # can match everything up to the file context across turns and users
+        return self._static_prompt + file_context
+    
+    def _build_static_prompt(self) -> str:
+        """Build the static system prompt text that precedes the file context"""
         return """You are an intelligent assistant that can use web search and file system tools when needed. You can chain multiple tools together and loop through multiple steps to complete complex tasks.
 
 Available Tools:
@@ -239,8 +447,6 @@ CRITICAL: After receiving tool results with case study information, you MUST imm
 
 IMPORTANT: If you have all the information needed to answer the user's question, you MUST provide your answer. If you received file content or search results that answer the question, don't just think about it - provide the answer!
 
-""" + file_context + """
-
 IMPORTANT RULES:
 1. ALWAYS start with <think> tags
 2. After receiving tool results, you can chain multiple tools or provide a final answer
@@ -269,61 +475,95 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
         """
         Run the agent loop with step-bounded tool execution
         """
-        agent_messages = messages.copy()
         step = 0
+        max_steps = self.max_steps  # Fixed for the whole run
         total_usage = {"tokens_in": 0, "tokens_out": 0, "cost_usd": 0.0}
-        previous_tool_calls = []  # Track previous tool calls to prevent loops
+        previous_tool_calls = set()  # Track previous tool calls to prevent loops
         tool_call_count = 0  # Track total tool calls
-        thought_process = []  # Track thinking steps for frontend display
+        email_task_done = False  # Whether the latest tool result completed an email task
+        unconsumed_tool_message = None  # (latest tool result message, its compacted content) until the model responds
+        last_tool = None  # (name, raw output) of the most recent tool run, for forced answers
+        thought_process = deque(maxlen=self.thought_process_cap)  # Track recent thinking steps for frontend display
+        loop_start_ns = time.monotonic_ns()  # Thought entries carry integer ms offsets from here
         
         # Add system prompt with current file context
-        system_prompt = await self.get_system_prompt()
-        agent_messages.insert(0, {
-            "role": "system",
-            "content": system_prompt
-        })
+        system_prompt = await self.get_system_prompt(messages)
+        agent_messages = [{"role": "system", "content": system_prompt}, *messages[-self.MAX_HISTORY_MESSAGES:]]
         
-        while step < self.max_steps:
+        while step < max_steps:
             step += 1
-            logger.info(f"Agent step {step}/{self.max_steps}")
+            logger.info("Agent step %d/%d", step, max_steps)
+            speculative_calls = []  # Tool calls started while the response was still streaming
+            speculative_tasks = []
+            speculative_signatures = set()  # Calls already started from this response
+            tools_done = None  # This step's tool runs, once they're gathered
             
             try:
                 # Emit thought card for thinking
-                thought_process.append({
+                self._record_thought(thought_process, {
                     "step": step,
                     "type": "thought_card",
                     "card_type": "thinking",
                     "content": f"Processing step {step}...",
                     "meta": f"Analyzing request and determining next actions",
-                    "timestamp": time.time()
+                    "t_ms": (time.monotonic_ns() - loop_start_ns) // 1_000_000
                 })
                 
-                # Get response from LLM
-                result = await provider_manager.get_completion(
+                # Frames streamed by a running tool are relayed to the client as they arrive
+                tool_frames = asyncio.Queue()
+                stream_to_client = tool_frames.put_nowait
+                
+                # Stream the LLM response, starting each tool as soon as its block closes
+                response_content = ""
+                tool_scan_pos = 0  # End of the last closed <tool> block
+                async for chunk in provider_manager.stream_completion(
                     provider="openai",
                     messages=agent_messages,
                     model="gpt-4o-mini"
-                )
-                
-                # Accumulate usage
-                usage = result.get("usage", {})
-                total_usage["tokens_in"] += usage.get("tokens_in", 0)
-                total_usage["tokens_out"] += usage.get("tokens_out", 0)
-                total_usage["cost_usd"] += usage.get("cost_usd", 0.0)
-                
-                response_content = result["message"]["content"]
+                ):
+                    if "usage" in chunk:
+                        # Accumulate usage
+                        usage = chunk["usage"]
+                        total_usage["tokens_in"] += usage.get("tokens_in", 0)
+                        total_usage["tokens_out"] += usage.get("tokens_out", 0)
+                        total_usage["cost_usd"] += usage.get("cost_usd", 0.0)
+                        continue
+                    
+                    # A closing tag can only complete inside the new text or straddle its start
+                    scan_from = max(tool_scan_pos, len(response_content) - len("</tool>") + 1)
+                    response_content += chunk.get("content", "")
+                    if response_content.find("</tool>", scan_from) == -1:
+                        continue
+                    
+                    for match in _TOOL_RE.finditer(response_content, tool_scan_pos):
+                        tool_scan_pos = match.end()
+                        early_tool_call = self._load_tool_json(match.group(1))
+                        if early_tool_call is None:
+                            continue
+                        # Only start side-effect-free calls that will pass the limit and duplicate checks below
+                        early_name = early_tool_call.get('name', 'unknown')
+                        early_signature = self._tool_signature(early_name, early_tool_call.get('args', {}))
+                        if (
+                            early_name in self.SPECULATIVE_TOOLS
+                            and tool_call_count + len(speculative_calls) < 5
+                            and early_signature not in speculative_signatures
+                            and (early_signature not in previous_tool_calls or early_name in self.TOOL_CACHE_TTLS)
+                        ):
+                            speculative_signatures.add(early_signature)
+                            speculative_tasks.append(asyncio.create_task(self._run_tool_limited(early_tool_call, step, stream_to_client)))
+                        else:
+                            speculative_tasks.append(None)
+                        speculative_calls.append(early_tool_call)
                 
-                # Parse the response
-                thinking = self.parse_thinking(response_content)
-                tool_call = self.parse_tool_call(response_content)
-                final_answer = self.parse_answer(response_content)
+                # Parse the response, collecting every tool call in the same scan
+                thinking, tool_calls, final_answer = self.parse_response(response_content)
                 
-                logger.info(f"Step {step} - Thinking: {thinking[:100] if thinking else 'None'}")
-                logger.info(f"Step {step} - Tool call: {tool_call}")
+                logger.info("Step %d - Thinking: %.100s", step, thinking or 'None')
+                logger.info("Step %d - Tool calls: %s", step, tool_calls)
                 if final_answer:
-                    logger.info(f"Step {step} - Final answer found (length: {len(final_answer)})")
+                    logger.info("Step %d - Final answer found (length: %d)", step, len(final_answer))
                 else:
-                    logger.info(f"Step {step} - Final answer: None")
+                    logger.info("Step %d - Final answer: None", step)
                 
                 # Capture thinking step for frontend display
                 if thinking:
@@ -331,7 +571,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                         "step": step,
                         "type": "thinking",
                         "content": thinking.strip(),
-                        "timestamp": time.time()
+                        "t_ms": (time.monotonic_ns() - loop_start_ns) // 1_000_000
                     })
                 
                 # Add assistant response to conversation
@@ -340,221 +580,274 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                     "content": response_content
                 })
                 
-                # Execute tool call if present
-                if tool_call:
-                    tool_call_count += 1
-                    
-                    # Emit thought card for executing
-                    thought_process.append({
-                        "step": step,
-                        "type": "thought_card",
-                        "card_type": "executing",
-                        "content": f"Executing {tool_call.get('name', 'unknown')} tool...",
-                        "meta": f"Tool: {tool_call.get('name', 'unknown')}",
-                        "timestamp": time.time()
-                    })
-                    
-                    # Check for tool call limit (5 max)
-                    if tool_call_count > 5:
-                        logger.warning(f"Tool call limit reached ({tool_call_count}), forcing final answer")
-                        yield f"data: {json.dumps({'type': 'final_message', 'content': 'I have reached the maximum number of tool calls. Based on my research, I can provide you with the information I have gathered so far.'})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
-                        return
-                    
-                    # Check for duplicate tool calls to prevent loops
-                    tool_args = tool_call.get('args', {})
-                    if not tool_args:
-                        tool_args = {k: v for k, v in tool_call.items() if k not in ["name", "args"]}
-                    tool_signature = f"{tool_call.get('name', '')}:{json.dumps(tool_args, sort_keys=True)}"
-                    if tool_signature in previous_tool_calls:
-                        logger.warning(f"Duplicate tool call detected: {tool_signature}")
-                        # Force a final answer to break the loop
-                        yield f"data: {json.dumps({'type': 'final_message', 'content': 'I found the information but encountered a processing loop. Based on my search results, I can provide you with the available information about case studies.'})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
-                        return
-                    
-                    previous_tool_calls.append(tool_signature)
-                    
-                    # Capture tool execution step for frontend display
-                    thought_process.append({
-                        "step": step,
-                        "type": "tool_execution",
-                        "tool_name": tool_call.get('name', 'unknown'),
-                        "tool_args": tool_call.get('args', {}),
-                        "timestamp": time.time()
-                    })
-                    
-                    # Create a streaming function that we can pass to execute_tool
-                    streaming_buffer = []
-                    def stream_to_buffer(data):
-                        streaming_buffer.append(data)
+                # Once a response acts on the previous tool result, re-send only a trimmed copy of it
+                # (a think-only reply hasn't used it yet, so the next step still gets it in full)
+                if unconsumed_tool_message is not None and (tool_calls or final_answer):
+                    tool_message, compacted_content = unconsumed_tool_message
+                    tool_message["content"] = compacted_content
+                    unconsumed_tool_message = None
+                
+                # Execute tool calls if present; independent calls from one response run concurrently
+                if tool_calls:
+                    tool_names = []  # Bound once per call and reused when the results come back
+                    for tool_call in tool_calls:
+                        tool_call_count += 1
+                        tool_name = tool_call.get('name', 'unknown')
+                        tool_names.append(tool_name)
+                        
+                        # Emit thought card for executing
+                        self._record_thought(thought_process, {
+                            "step": step,
+                            "type": "thought_card",
+                            "card_type": "executing",
+                            "content": f"Executing {tool_name} tool...",
+                            "meta": f"Tool: {tool_name}",
+                            "t_ms": (time.monotonic_ns() - loop_start_ns) // 1_000_000
+                        })
+                        
+                        # Check for tool call limit (5 max)
+                        if tool_call_count > 5:
+                            logger.warning("Tool call limit reached (%d), forcing final answer", tool_call_count)
+                            self._cancel_tasks(speculative_tasks)
+                            for frame in self._finish_frames('I have reached the maximum number of tool calls. Based on my research, I can provide you with the information I have gathered so far.', total_usage, step):
+                                yield frame
+                            return
+                        
+                        # Check for duplicate tool calls to prevent loops
+                        tool_args = tool_call.get('args', {})
+                        if not tool_args:
+                            tool_args = {k: v for k, v in tool_call.items() if k not in ["name", "args"]}
+                        tool_signature = self._tool_signature(tool_name, tool_args)
+                        # Repeated read-only calls are served from the tool cache instead of aborting
+                        if tool_signature in previous_tool_calls and tool_name not in self.TOOL_CACHE_TTLS:
+                            logger.warning("Duplicate tool call detected: %s", tool_signature[0])
+                            self._cancel_tasks(speculative_tasks)
+                            # Force a final answer to break the loop
+                            for frame in self._finish_frames('I found the information but encountered a processing loop. Based on my search results, I can provide you with the available information about case studies.', total_usage, step):
+                                yield frame
+                            return
+                        
+                        previous_tool_calls.add(tool_signature)
+                        
+                        # Capture tool execution step for frontend display
+                        thought_process.append({
+                            "step": step,
+                            "type": "tool_execution",
+                            "tool_name": tool_name,
+                            "tool_args": tool_args,
+                            "t_ms": (time.monotonic_ns() - loop_start_ns) // 1_000_000
+                        })
                     
-                    tool_result = await self.execute_tool(tool_call, step, stream_to_buffer)
+                    # Reuse tool runs started during streaming when they match the final parse
+                    tool_runs = []
+                    for tool_call in tool_calls:
+                        for index, early_tool_call in enumerate(speculative_calls):
+                            if speculative_tasks[index] is not None and early_tool_call == tool_call:
+                                tool_runs.append(speculative_tasks[index])
+                                speculative_tasks[index] = None
+                                break
+                        else:
+                            tool_runs.append(self._run_tool_limited(tool_call, step, stream_to_client))
+                    self._cancel_tasks(speculative_tasks)
                     
-                    # Yield any buffered streaming data
-                    for data in streaming_buffer:
-                        yield data
+                    tools_done = asyncio.ensure_future(asyncio.gather(*tool_runs))
+                    async for frame in self._relay_tool_frames(tools_done, tool_frames):
+                        yield frame
+                    tool_outputs = tools_done.result()
                     
-                    # Capture tool result for frontend display
-                    thought_process.append({
-                        "step": step,
-                        "type": "tool_result",
-                        "tool_name": tool_call.get('name', 'unknown'),
-                        "result": tool_result[:500] + "..." if len(str(tool_result)) > 500 else str(tool_result),
-                        "timestamp": time.time()
-                    })
+                    result_messages = []
+                    compacted_messages = []
+                    email_task_done = False
+                    for tool_name, tool_output in zip(tool_names, tool_outputs):
+                        tool_result = self._encode_tool_result(tool_output)
+                        
+                        # Capture tool result for frontend display
+                        thought_process.append({
+                            "step": step,
+                            "type": "tool_result",
+                            "tool_name": tool_name,
+                            "result": tool_result[:500] + "..." if len(tool_result) > 500 else tool_result,
+                            "t_ms": (time.monotonic_ns() - loop_start_ns) // 1_000_000
+                        })
+                        
+                        result_messages.append(f"Tool result from {tool_name}: {tool_result}")
+                        compacted_messages.append(f"Tool result from {tool_name}: {self._compact_tool_result(tool_name, tool_output, tool_result)}")
+                        
+                        # Flag email completion now so the force-answer check doesn't rescan the message
+                        email_task_done = email_task_done or tool_name == "email_write" or (
+                            tool_name == "file_write" and "email" in tool_result.lower()
+                        )
                     
-                    # Add tool result to conversation as user message
+                    # Add all tool results to conversation as one user message so the next turn sees them together
                     agent_messages.append({
                         "role": "user", 
-                        "content": f"Tool result from {tool_call.get('name', 'unknown')}: {tool_result}"
+                        "content": "\n\n".join(result_messages)
                     })
+                    
+                    last_tool = (tool_names[-1], tool_outputs[-1])
+                    self._trim_history(agent_messages)
+                    unconsumed_tool_message = (agent_messages[-1], "\n\n".join(compacted_messages))
                 
                 # Check if we have a final answer
                 if final_answer:
-                    logger.info(f"Agent completed in {step} steps")
+                    logger.info("Agent completed in %d steps", step)
+                    
+                    final_answer = final_answer.strip()
                     
                     # Add final answer to thought process
                     thought_process.append({
                         "step": step,
                         "type": "final_answer",
-                        "content": final_answer.strip(),
-                        "timestamp": time.time()
+                        "content": final_answer,
+                        "t_ms": (time.monotonic_ns() - loop_start_ns) // 1_000_000
                     })
                     
-                    yield f"data: {json.dumps({'type': 'final_message', 'content': final_answer.strip()})}\n\n"
-                    yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                    for frame in self._finish_frames(final_answer, total_usage, step):
+                        yield frame
                     return
                 
                 # If we have a tool call but no final answer, continue the loop for chaining
-                if tool_call:
-                    logger.info(f"Step {step}: Tool executed, continuing for potential chaining")
+                if tool_calls:
+                    logger.info("Step %d: Tool executed, continuing for potential chaining", step)
                     continue
                 
                 # If no thinking, tool call, or final answer, but we have content, treat it as an answer
-                if not thinking and not tool_call and not final_answer:
+                if not thinking and not tool_calls and not final_answer:
                     # Check if the response contains useful content that should be treated as an answer
-                    content_length = len(response_content.strip())
-                    if content_length > 50:  # Has substantial content
-                        logger.info(f"LLM provided direct answer without format tags ({content_length} chars), treating as final answer")
-                        yield f"data: {json.dumps({'type': 'final_message', 'content': response_content.strip()})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                    direct_answer = response_content.strip()
+                    if len(direct_answer) > 50:  # Has substantial content
+                        logger.info("LLM provided direct answer without format tags (%d chars), treating as final answer", len(direct_answer))
+                        for frame in self._finish_frames(direct_answer, total_usage, step):
+                            yield frame
                         return
                     else:
-                        logger.error(f"LLM response doesn't follow required format: {response_content[:200]}")
-                        yield f"data: {json.dumps({'type': 'final_message', 'content': 'I encountered a formatting error in my response. Here is what I found so far based on the search results, but I may not have the complete information you requested.'})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                        logger.error("LLM response doesn't follow required format: %.200s", response_content)
+                        for frame in self._finish_frames('I encountered a formatting error in my response. Here is what I found so far based on the search results, but I may not have the complete information you requested.', total_usage, step):
+                            yield frame
                         return
                 
                 # If we have thinking but no tool call or final answer, force an answer based on context
-                if thinking and not tool_call and not final_answer:
+                if thinking and not tool_calls and not final_answer:
                     # Force answer if we're past step 3 OR if we just completed an email task
                     should_force_answer = step > 3
                     
                     # Check if we just completed an email-related task
-                    for msg in reversed(agent_messages[-2:]):  # Check last 2 messages
-                        if msg.get("role") == "user" and "email_write" in msg.get("content", ""):
-                            should_force_answer = True
-                            break
-                        if msg.get("role") == "user" and "file_write" in msg.get("content", "") and "email" in msg.get("content", "").lower():
-                            should_force_answer = True
-                            break
+                    if email_task_done:
+                        should_force_answer = True
+                    email_task_done = False
                     
                     if should_force_answer:
-                        logger.warning(f"Agent thinking but not acting after step {step}, forcing final answer")
-                        # Look for the last tool result to provide context
-                        last_tool_result = None
-                        for msg in reversed(agent_messages):
-                            if msg.get("role") == "user" and msg.get("content", "").startswith("Tool result:"):
-                                last_tool_result = msg["content"]
-                                break
-                        
-                        # If the last tool was email-related, provide appropriate completion message
-                        if last_tool_result and ("email" in last_tool_result.lower() or "status\": \"sent" in last_tool_result):
-                            content = "Task completed successfully. The email has been sent as requested."
-                        elif last_tool_result:
-                            content = f"Based on my research and actions, I have completed the requested task. {last_tool_result}"
-                        else:
-                            content = "I have completed the requested task based on the available information."
+                        logger.warning("Agent thinking but not acting after step %d, forcing final answer", step)
+                        content = self._forced_answer(last_tool)
                     
-                    yield f"data: {json.dumps({'type': 'final_message', 'content': content})}\n\n"
-                    yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                    for frame in self._finish_frames(content, total_usage, step):
+                        yield frame
                     return
                 
             except Exception as e:
-                logger.error(f"Agent step {step} error: {str(e)}")
-                yield f"data: {json.dumps({'type': 'final_message', 'content': f'I encountered an error during my research: {str(e)}'})}\n\n"
-                yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                logger.error("Agent step %d error: %s", step, e)
+                self._cancel_tasks(speculative_tasks)
+                for frame in self._finish_frames(f'I encountered an error during my research: {str(e)}', total_usage, step):
+                    yield frame
                 return
+            finally:
+                # Don't leave tool runs behind when the step fails or the client disconnects
+                pending = [task for task in (*speculative_tasks, tools_done) if task is not None and not task.done()]
+                if pending:
+                    self._cancel_tasks(pending)
+                    await asyncio.gather(*pending, return_exceptions=True)
         
         # Max steps reached
-        logger.warning(f"Agent reached max steps ({self.max_steps})")
-        yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': 'I have reached my maximum number of research steps. Here is what I found so far.', 'icon': '🎯', 'title': 'Final Answer'})}\n\n"
-        yield f"data: {json.dumps({'type': 'final_message', 'content': 'I have reached my maximum number of research steps. Here is what I found so far.'})}\n\n"
-        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+        logger.warning("Agent reached max steps (%d)", max_steps)
+        yield _MAX_STEPS_CARD_TEMPLATE % step
+        for frame in self._finish_frames(_MAX_STEPS_MESSAGE, total_usage, step):
+            yield frame
         return
     
-    async def run_agent_loop_streaming(self, messages: List[Dict[str, Any]], provider_manager) -> AsyncGenerator[str, None]:
+    async def run_agent_loop_streaming(self, messages: List[Dict[str, Any]], provider_manager) -> AsyncGenerator[bytes, None]:
         """
         Run the agent loop with streaming thought process updates
         """
-        agent_messages = messages.copy()
         step = 0
+        max_steps = self.max_steps  # Fixed for the whole run
         total_usage = {"tokens_in": 0, "tokens_out": 0, "cost_usd": 0.0}
-        previous_tool_calls = []
+        previous_tool_calls = set()
         tool_call_count = 0
+        email_task_done = False  # Whether the latest tool result completed an email task
+        unconsumed_tool_message = None  # (latest tool result message, its compacted content) until the model responds
+        last_tool = None  # (name, raw output) of the most recent tool run, for forced answers
         
         # Add system prompt
-        system_prompt = await self.get_system_prompt()
-        agent_messages.insert(0, {
-            "role": "system",
-            "content": system_prompt
-        })
+        system_prompt = await self.get_system_prompt(messages)
+        agent_messages = [{"role": "system", "content": system_prompt}, *messages[-self.MAX_HISTORY_MESSAGES:]]
         
         # Send initial status
-        yield f"data: {json.dumps({'type': 'status', 'message': 'Agent started', 'step': 0})}\n\n"
+        yield _AGENT_STARTED_FRAME
         
-        while step < self.max_steps:
+        while step < max_steps:
             step += 1
-            logger.info(f"Agent step {step}/{self.max_steps}")
+            logger.info("Agent step %d/%d", step, max_steps)
             
             # Send step start
-            yield f"data: {json.dumps({'type': 'step_start', 'step': step})}\n\n"
+            yield _sse_frame({'type': 'step_start', 'step': step})
             
+            tool_task = None  # Tool run for this step, possibly started while the response streams
             try:
                 # Send thinking card IMMEDIATELY when step starts
-                yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'thinking', 'step': step, 'content': f'Processing step {step}...', 'icon': '💭', 'title': 'Thinking'})}\n\n"
+                yield _sse_frame({'type': 'thought_card', 'card_type': 'thinking', 'step': step, 'content': f'Processing step {step}...', 'icon': '💭', 'title': 'Thinking'})
                 
-                # Longer delay to slow down card display
-                import asyncio
-                await asyncio.sleep(1.0)  # 1 second delay
+                # Frames streamed by a running tool are relayed to the client as they arrive
+                tool_frames = asyncio.Queue()
+                stream_to_client = tool_frames.put_nowait
                 
-                # Get response from LLM
-                result = await provider_manager.get_completion(
+                # Stream the LLM response, surfacing thinking and starting the tool as soon as their tags close
+                response_content = ""
+                thinking_sent = False
+                tool_closed = False
+                early_tool_call = None
+                async for chunk in provider_manager.stream_completion(
                     provider="openai",
                     messages=agent_messages,
                     model="gpt-4o-mini"
-                )
-                
-                # Accumulate usage
-                usage = result.get("usage", {})
-                total_usage["tokens_in"] += usage.get("tokens_in", 0)
-                total_usage["tokens_out"] += usage.get("tokens_out", 0)
-                total_usage["cost_usd"] += usage.get("cost_usd", 0.0)
-                
-                response_content = result["message"]["content"]
+                ):
+                    if "usage" in chunk:
+                        # Accumulate usage
+                        usage = chunk["usage"]
+                        total_usage["tokens_in"] += usage.get("tokens_in", 0)
+                        total_usage["tokens_out"] += usage.get("tokens_out", 0)
+                        total_usage["cost_usd"] += usage.get("cost_usd", 0.0)
+                        continue
+                    
+                    # A closing tag can only complete inside the new text or straddle its start
+                    scan_from = max(0, len(response_content) - len("</think>") + 1)
+                    response_content += chunk.get("content", "")
+                    
+                    # Update thinking card with actual content
+                    if not thinking_sent and response_content.find("</think>", scan_from) != -1:
+                        thinking_sent = True
+                        thinking = self.parse_thinking(response_content)
+                        if thinking:
+                            # Card pacing is done by the client so the model keeps streaming meanwhile
+                            yield _sse_frame({'type': 'thought_card', 'card_type': 'thinking', 'step': step, 'content': thinking.strip(), 'icon': '💭', 'title': 'Thinking', 'display_delay_ms': 1500})
+                    
+                    # Start a side-effect-free tool while the rest of the response streams, if it will pass the loop checks
+                    if not tool_closed and response_content.find("</tool>", scan_from) != -1:
+                        tool_closed = True
+                        early_tool_call = self.parse_tool_call(response_content)
+                        if early_tool_call and tool_call_count < 5 and early_tool_call.get('name') in self.SPECULATIVE_TOOLS:
+                            early_name = early_tool_call['name']
+                            early_signature = self._tool_signature(early_name, early_tool_call.get('args', {}))
+                            if early_signature not in previous_tool_calls or early_name in self.TOOL_CACHE_TTLS:
+                                tool_task = asyncio.create_task(self._run_tool(early_tool_call, step, stream_to_client))
                 
                 # Parse the response
-                thinking = self.parse_thinking(response_content)
-                tool_call = self.parse_tool_call(response_content)
-                final_answer = self.parse_answer(response_content)
+                thinking, tool_calls, final_answer = self.parse_response(response_content)
+                tool_call = tool_calls[0] if tool_calls else None  # One tool per streamed step
                 
-                # Update thinking card with actual content
-                if thinking:
-                    yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'thinking', 'step': step, 'content': thinking.strip(), 'icon': '💭', 'title': 'Thinking'})}\n\n"
-                    # Longer delay to slow down card display
-                    import asyncio
-                    await asyncio.sleep(1.5)  # 1.5 second delay
+                # Drop a speculative tool run that doesn't match the final parse
+                if tool_task and tool_call != early_tool_call:
+                    tool_task.cancel()
+                    tool_task = None
                 
                 # Add assistant response to conversation
                 agent_messages.append({
@@ -562,91 +855,87 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                     "content": response_content
                 })
                 
+                # Once a response acts on the previous tool result, re-send only a trimmed copy of it
+                # (a think-only reply hasn't used it yet, so the next step still gets it in full)
+                if unconsumed_tool_message is not None and (tool_call or final_answer):
+                    tool_message, compacted_content = unconsumed_tool_message
+                    tool_message["content"] = compacted_content
+                    unconsumed_tool_message = None
+                
                 # Execute tool call if present
                 if tool_call:
                     tool_call_count += 1
+                    tool_name = tool_call.get('name', 'unknown')
+                    tool_args = tool_call.get('args', {})
                     
                     # Check for tool call limit
                     if tool_call_count > 5:
-                        yield f"data: {json.dumps({'type': 'error', 'message': 'Tool call limit reached'})}\n\n"
+                        yield _TOOL_LIMIT_FRAME
                         break
                     
                     # Check for duplicate tool calls
-                    tool_signature = f"{tool_call.get('name', '')}:{json.dumps(tool_call.get('args', {}), sort_keys=True)}"
-                    if tool_signature in previous_tool_calls:
-                        yield f"data: {json.dumps({'type': 'error', 'message': 'Duplicate tool call detected'})}\n\n"
+                    tool_signature = self._tool_signature(tool_name, tool_args)
+                    # Repeated read-only calls are served from the tool cache instead of aborting
+                    if tool_signature in previous_tool_calls and tool_name not in self.TOOL_CACHE_TTLS:
+                        yield _DUPLICATE_TOOL_FRAME
                         break
                     
-                    previous_tool_calls.append(tool_signature)
+                    previous_tool_calls.add(tool_signature)
                     
                     # Stream tool execution as thought_card IMMEDIATELY
-                    tool_name = tool_call.get('name', 'unknown')
-                    tool_args = tool_call.get('args', {})
-                    
                     # Special handling for case_study_lookup to surface the search query
                     if tool_name == 'case_study_lookup' and 'query' in tool_args:
                         execution_content = f'🔍 Running search: `{tool_args["query"]}`'
                     else:
                         execution_content = f'Executing: {tool_name}'
                     
-                    yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'tool_execution', 'step': step, 'content': execution_content, 'tool_name': tool_name, 'tool_args': tool_args, 'icon': '🔧', 'title': 'Tool Execution'})}\n\n"
-                    
-                    # Delay before executing tool
-                    import asyncio
-                    await asyncio.sleep(1.0)  # 1 second delay before tool execution
+                    yield _sse_frame({'type': 'thought_card', 'card_type': 'tool_execution', 'step': step, 'content': execution_content, 'tool_name': tool_name, 'tool_args': tool_args, 'icon': '🔧', 'title': 'Tool Execution'})
                     
-                    # Create a streaming function that we can pass to execute_tool
-                    streaming_buffer = []
-                    def stream_to_buffer(data):
-                        streaming_buffer.append(data)
-                    
-                    tool_result = await self.execute_tool(tool_call, step, stream_to_buffer)
-                    
-                    # Yield any buffered streaming data
-                    for data in streaming_buffer:
-                        yield data
+                    if not tool_task:
+                        tool_task = asyncio.create_task(self._run_tool(tool_call, step, stream_to_client))
+                    async for frame in self._relay_tool_frames(tool_task, tool_frames):
+                        yield frame
+                    tool_output = tool_task.result()
+                    # Encoded once and shared by the result card and the conversation
+                    tool_result = self._encode_tool_result(tool_output)
                     
                     # Stream tool result as thought_card IMMEDIATELY after execution
-                    tool_name = tool_call.get('name', 'unknown')
-                    
                     # Special handling for case_study_lookup to surface the search queries used
-                    if tool_name == 'case_study_lookup':
-                        try:
-                            import json as json_module
-                            result_dict = json_module.loads(tool_result) if isinstance(tool_result, str) else tool_result
-                            
-                            if isinstance(result_dict, dict) and 'search_queries_used' in result_dict:
-                                queries_used = result_dict['search_queries_used']
-                                total_found = result_dict.get('total_found', 0)
-                                
-                                if queries_used:
-                                    result_content = f'🔍 Search completed: {total_found} results found using {len(queries_used)} queries:\n' + '\n'.join(f'• {q}' for q in queries_used)
-                                else:
-                                    result_content = f'🔍 Search completed: {total_found} results found'
-                            else:
-                                result_content = f'Result from {tool_name}: {str(tool_result)[:200]}...'
-                        except:
-                            result_content = f'Result from {tool_name}: {str(tool_result)[:200]}...'
+                    if tool_name == 'case_study_lookup' and isinstance(tool_output, dict) and 'search_queries_used' in tool_output:
+                        queries_used = tool_output['search_queries_used']
+                        total_found = tool_output.get('total_found', 0)
+                        
+                        if queries_used:
+                            result_content = f'🔍 Search completed: {total_found} results found using {len(queries_used)} queries:\n' + '\n'.join(f'• {q}' for q in queries_used)
+                        else:
+                            result_content = f'🔍 Search completed: {total_found} results found'
                     else:
-                        result_preview = tool_result[:200] + "..." if len(str(tool_result)) > 200 else str(tool_result)
+                        result_preview = tool_result[:200] + "..." if len(tool_result) > 200 else tool_result
                         result_content = f'Result from {tool_name}: {result_preview}'
                     
-                    yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'tool_result', 'step': step, 'content': result_content, 'tool_name': tool_name, 'result': str(tool_result), 'icon': '✅', 'title': 'Tool Result'})}\n\n"
-                    
-                    # Longer delay to slow down card display
-                    await asyncio.sleep(2.0)  # 2 second delay after tool result
+                    yield _sse_frame({'type': 'thought_card', 'card_type': 'tool_result', 'step': step, 'content': result_content, 'tool_name': tool_name, 'result': tool_result, 'icon': '✅', 'title': 'Tool Result', 'display_delay_ms': 2000})
                     
                     # Add tool result to conversation as user message
                     agent_messages.append({
                         "role": "user", 
-                        "content": f"Tool result from {tool_call.get('name', 'unknown')}: {tool_result}"
+                        "content": f"Tool result from {tool_name}: {tool_result}"
                     })
+                    
+                    last_tool = (tool_name, tool_output)
+                    self._trim_history(agent_messages)
+                    unconsumed_tool_message = (agent_messages[-1], f"Tool result from {tool_name}: {self._compact_tool_result(tool_name, tool_output, tool_result)}")
+                    
+                    # Flag email completion now so the force-answer check doesn't rescan the message
+                    email_task_done = tool_name == "email_write" or (
+                        tool_name == "file_write" and "email" in tool_result.lower()
+                    )
                 
                 # Check if we have a final answer
                 if final_answer:
-                    yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': final_answer.strip(), 'icon': '🎯', 'title': 'Final Answer'})}\n\n"
-                    yield f"data: {json.dumps({'type': 'final_message', 'content': final_answer.strip()})}\n\n"
-                    yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                    final_answer = final_answer.strip()
+                    yield _sse_frame({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': final_answer, 'icon': '🎯', 'title': 'Final Answer'})
+                    for frame in self._finish_frames(final_answer, total_usage, step):
+                        yield frame
                     break
                 
                 # If we have a tool call but no final answer, continue
@@ -655,11 +944,11 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 
                 # Handle other cases similar to regular run_agent_loop
                 if not thinking and not tool_call and not final_answer:
-                    content_length = len(response_content.strip())
-                    if content_length > 50:
-                        yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': response_content.strip(), 'icon': '🎯', 'title': 'Final Answer'})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_message', 'content': response_content.strip()})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                    direct_answer = response_content.strip()
+                    if len(direct_answer) > 50:
+                        yield _sse_frame({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': direct_answer, 'icon': '🎯', 'title': 'Final Answer'})
+                        for frame in self._finish_frames(direct_answer, total_usage, step):
+                            yield frame
                         break
                 
                 # Force answer if thinking but not acting
@@ -668,84 +957,169 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                     should_force_answer = step > 3
                     
                     # Check if we just completed an email-related task
-                    for msg in reversed(agent_messages[-2:]):  # Check last 2 messages
-                        if msg.get("role") == "user" and "email_write" in msg.get("content", ""):
-                            should_force_answer = True
-                            break
-                        if msg.get("role") == "user" and "file_write" in msg.get("content", "") and "email" in msg.get("content", "").lower():
-                            should_force_answer = True
-                            break
+                    if email_task_done:
+                        should_force_answer = True
+                    email_task_done = False
                     
                     if should_force_answer:
-                        # Look for the last tool result to provide context
-                        last_tool_result = None
-                        for msg in reversed(agent_messages):
-                            if msg.get("role") == "user" and msg.get("content", "").startswith("Tool result:"):
-                                last_tool_result = msg["content"]
-                                break
+                        final_content = self._forced_answer(last_tool)
                         
-                        # If the last tool was email-related, provide appropriate completion message
-                        if last_tool_result and ("email" in last_tool_result.lower() or "status\": \"sent" in last_tool_result):
-                            final_content = "Task completed successfully. The email has been sent as requested."
-                        elif last_tool_result:
-                            final_content = f"Based on my research and actions, I have completed the requested task."
-                        else:
-                            final_content = "I have completed the requested task based on the available information."
-                        
-                        yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': final_content, 'icon': '🎯', 'title': 'Final Answer'})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_message', 'content': final_content})}\n\n"
-                        yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+                        yield _sse_frame({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': final_content, 'icon': '🎯', 'title': 'Final Answer'})
+                        for frame in self._finish_frames(final_content, total_usage, step):
+                            yield frame
                         break
                 
             except Exception as e:
-                logger.error(f"Agent step {step} error: {str(e)}")
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                logger.error("Agent step %d error: %s", step, e)
+                yield _sse_frame({'type': 'error', 'message': str(e)})
                 break
+            finally:
+                # Don't leave a speculative tool run behind when the step fails or the client disconnects
+                if tool_task is not None and not tool_task.done():
+                    tool_task.cancel()
+                    await asyncio.gather(tool_task, return_exceptions=True)
         
         # Max steps reached
-        if step >= self.max_steps:
-            yield f"data: {json.dumps({'type': 'thought_card', 'card_type': 'final_answer', 'step': step, 'content': 'I have reached my maximum number of research steps. Here is what I found so far.', 'icon': '🎯', 'title': 'Final Answer'})}\n\n"
-            yield f"data: {json.dumps({'type': 'final_message', 'content': 'I have reached my maximum number of research steps. Here is what I found so far.'})}\n\n"
-            yield f"data: {json.dumps({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step})}\n\n"
+        if step >= max_steps:
+            yield _MAX_STEPS_CARD_TEMPLATE % step
+            for frame in self._finish_frames(_MAX_STEPS_MESSAGE, total_usage, step):
+                yield frame
+    
+    def _compact_tool_result(self, tool_name: str, tool_output: Any, tool_result: str) -> str:
+        """Build the shorter form of a tool result that is re-sent once the model has responded to it"""
+        limit = self.CONSUMED_TOOL_RESULT_MAX_CHARS
+        if len(tool_result) <= limit:
+            return tool_result
+        
+        # Search results keep their top hits without the scraped page content
+        if tool_name in ("web_search", "case_study_lookup") and isinstance(tool_output, dict) and isinstance(tool_output.get("results"), list):
+            summary = {key: value for key, value in tool_output.items() if key != "results"}
+            summary["results"] = [
+                {
+                    "title": hit.get("title", ""),
+                    "url": hit.get("url", ""),
+                    "snippet": str(hit.get("snippet") or hit.get("description", ""))[:300]
+                }
+                for hit in tool_output["results"][:5]
+                if isinstance(hit, dict)
+            ]
+            compacted = self._encode_tool_result(summary)
+            if len(compacted) <= limit:
+                return compacted
+        
+        return f"{tool_result[:limit]}\n... [{len(tool_result) - limit} more characters already processed]"
+    
+    async def _relay_tool_frames(self, tool_run: asyncio.Future, tool_frames: asyncio.Queue) -> AsyncGenerator[bytes, None]:
+        """Yield frames streamed by a running tool as they arrive, until the tool finishes"""
+        while not tool_run.done():
+            next_frame = asyncio.ensure_future(tool_frames.get())
+            try:
+                await asyncio.wait((next_frame, tool_run), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                if not next_frame.done():
+                    next_frame.cancel()
+            if next_frame.done() and not next_frame.cancelled():
+                yield next_frame.result()
+        
+        while not tool_frames.empty():
+            yield tool_frames.get_nowait()
+    
+    def _cancel_tasks(self, tasks: List[Optional[asyncio.Task]]):
+        """Cancel speculative tool runs that won't be used"""
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+    
+    def _finish_frames(self, content: str, total_usage: Dict[str, Any], step: int) -> Tuple[bytes, bytes]:
+        """Build the final message and usage SSE frames that end an agent run"""
+        return (
+            _sse_frame({'type': 'final_message', 'content': content}),
+            _sse_frame({'type': 'final_usage', 'usage': total_usage, 'agent_steps': step}),
+        )
+    
+    def _forced_answer(self, last_tool: Optional[Tuple[str, Any]]) -> str:
+        """Build the answer used when the model keeps thinking without acting"""
+        # Only claim a send when email_write itself reported one
+        if last_tool and last_tool[0] == "email_write":
+            tool_output = last_tool[1]
+            if isinstance(tool_output, dict) and tool_output.get("status") == "sent":
+                return "Task completed successfully. The email has been sent as requested."
+        return "I have completed the requested task based on the available information."
+
+    def _trim_history(self, agent_messages: List[Dict[str, Any]]):
+        """Keep the system prompt and the most recent messages, so per-step input tokens stay bounded"""
+        excess = len(agent_messages) - 1 - self.MAX_HISTORY_MESSAGES
+        if excess > 0:
+            del agent_messages[1:1 + excess]
+    
+    def _record_thought(self, thought_process: deque, entry: Dict[str, Any]):
+        """Record a thought entry, skipping a thought card that repeats the previous one for the same step"""
+        if entry.get("type") == "thought_card" and thought_process:
+            last = thought_process[-1]
+            if last.get("type") == "thought_card" and last.get("card_type") == entry.get("card_type") and last.get("step") == entry.get("step"):
+                return
+        thought_process.append(entry)
+    
+    def _tool_signature(self, tool_name: str, tool_args: Dict[str, Any]) -> Tuple[str, bytes]:
+        """Build the signature used to detect repeated tool calls"""
+        # Hash the canonical args so large payloads (e.g. file_write content) aren't kept as set keys
+        args_digest = hashlib.blake2b(orjson.dumps(tool_args, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+        return tool_name, args_digest
+    
+    def parse_response(self, content: str) -> Tuple[Optional[str], List[Dict[str, Any]], Optional[str]]:
+        """Parse thinking, every valid tool call and the final answer from a response"""
+        # Same per-tag semantics as parse_thinking, parse_tool_call and parse_answer, which the streaming scans use
+        tool_calls = []
+        for match in _TOOL_RE.finditer(content):
+            tool_call = self._load_tool_json(match.group(1))
+            if tool_call is not None:
+                tool_calls.append(tool_call)
+        
+        return self.parse_thinking(content), tool_calls, self.parse_answer(content)
     
     def parse_thinking(self, content: str) -> Optional[str]:
         """Parse thinking content from response"""
-        match = re.search(r'<think>(.*?)</think>', content, re.DOTALL)
+        match = _THINK_RE.search(content)
         return match.group(1).strip() if match else None
     
     def parse_tool_call(self, content: str) -> Optional[Dict[str, Any]]:
         """Parse tool call from response"""
-        match = re.search(r'<tool>(.*?)</tool>', content, re.DOTALL)
+        match = _TOOL_RE.search(content)
         if match:
-            try:
-                tool_json = match.group(1).strip()
-                
-                # Fix double curly braces issue - handle both outer and nested braces
-                if tool_json.startswith('{{') and tool_json.endswith('}}'):
-                    tool_json = tool_json[1:-1]  # Remove outer braces
-                
-                # Fix nested double braces in args field
-                tool_json = re.sub(r'"args":\s*\{\{', '"args": {', tool_json)
-                tool_json = re.sub(r'\}\}\s*\}', '} }', tool_json)
-                
-                return json.loads(tool_json)
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid tool JSON: {str(e)}")
-                logger.error(f"Tool JSON content: {match.group(1).strip()}")
-                return None
+            return self._load_tool_json(match.group(1))
         return None
     
+    def _load_tool_json(self, tool_body: str) -> Optional[Dict[str, Any]]:
+        """Decode the JSON body of a <tool> tag"""
+        try:
+            tool_json = tool_body.strip()
+            
+            # Fix double curly braces issue - handle both outer and nested braces
+            if tool_json.startswith('{{') and tool_json.endswith('}}'):
+                tool_json = tool_json[1:-1]  # Remove outer braces
+            
+            # Fix nested double braces in args field
+            tool_json = _DOUBLE_BRACE_ARGS_RE.sub('"args": {', tool_json)
+            tool_json = _DOUBLE_BRACE_CLOSE_RE.sub('} }', tool_json)
+            
+            tool_call = orjson.loads(tool_json)
+            if not isinstance(tool_call, dict):
+                logger.error("Tool JSON is not an object: %s", tool_json)
+                return None
+            return tool_call
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
+            logger.error("Invalid tool JSON: %s", e)
+            logger.error("Tool JSON content: %s", tool_body.strip())
+            return None
+    
     def strip_internal_tags(self, content: str) -> str:
         """Strip internal tags like <think> and <tool> from content"""
         
-        # Remove <think>...</think> tags and their content
-        content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
-        
-        # Remove <tool>...</tool> tags and their content
-        content = re.sub(r'<tool>.*?</tool>', '', content, flags=re.DOTALL)
+        # Remove <think>...</think> and <tool>...</tool> tags and their content
+        content = _INTERNAL_TAGS_RE.sub('', content)
         
         # Clean up extra whitespace and newlines
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)  # Multiple newlines to double
+        content = _EXCESS_NEWLINES_RE.sub('\n\n', content)  # Multiple newlines to double
         content = content.strip()
         
         return content
@@ -753,45 +1127,50 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
     def parse_answer(self, content: str) -> Optional[str]:
         """Parse final answer from response"""
         # Try to find <answer> tags first and extract content WITHOUT the tags
-        match = re.search(r'<answer>(.*?)</answer>', content, re.DOTALL)
+        match = _ANSWER_RE.search(content)
         if match:
-            answer_content = match.group(1).strip()  # This extracts only the content inside the tags
-            logger.info(f"Found answer in tags, extracted content without tags: {answer_content[:100]}...")
-            # Strip internal tags from the answer content
-            return self.strip_internal_tags(answer_content)
+            return self._answer_from_tag(match.group(1))
         
+        return self._parse_untagged_answer(content)
+    
+    def _answer_from_tag(self, answer_body: str) -> str:
+        """Clean the body of an <answer> tag"""
+        answer_content = answer_body.strip()  # This extracts only the content inside the tags
+        logger.info("Found answer in tags, extracted content without tags: %.100s...", answer_content)
+        # Strip internal tags from the answer content
+        return self.strip_internal_tags(answer_content)
+    
+    def _parse_untagged_answer(self, content: str) -> Optional[str]:
+        """Find a final answer in a response that has no <answer> tags"""
         # If no <answer> tags but we have substantial content after tool results, treat it as answer
-        if "Tool result:" in content:
-            # Look for content after the last tool result
-            parts = content.split("Tool result:")
-            if len(parts) > 1:
-                last_part = parts[-1].strip()
-                # If there's substantial content after the tool result, it might be an answer
-                if len(last_part) > 100 and not last_part.startswith("{"):
-                    logger.info(f"Using fallback answer parsing: {last_part[:100]}...")
-                    return self.strip_internal_tags(last_part)
+        # Look for content after the last tool result
+        _, separator, last_part = content.rpartition("Tool result:")
+        if separator:
+            last_part = last_part.strip()
+            # If there's substantial content after the tool result, it might be an answer
+            if len(last_part) > 100 and not last_part.startswith("{"):
+                logger.info("Using fallback answer parsing: %.100s...", last_part)
+                return self.strip_internal_tags(last_part)
         
         # If we have substantial content that looks like an answer, use it
         # Look for content that starts with common answer patterns
-        answer_patterns = [
-            r'Here are the summaries.*?:',
-            r'Based on.*?research.*?:',
-            r'I found.*?case studies.*?:',
-            r'The following.*?results.*?:',
-            r'\d+\.\s*\*\*.*?\*\*'  # Numbered lists with bold titles
-        ]
-        
-        for pattern in answer_patterns:
-            if re.search(pattern, content, re.IGNORECASE | re.DOTALL):
-                # If we find answer-like content, return the full content
-                logger.info(f"Found answer-like content, using full response: {content[:100]}...")
-                return self.strip_internal_tags(content)
+        if _ANSWER_HINT_RE.search(content):
+            for pattern in _ANSWER_LIKE_RES:
+                if pattern.search(content):
+                    # If we find answer-like content, return the full content
+                    logger.info("Found answer-like content, using full response: %.100s...", content)
+                    return self.strip_internal_tags(content)
         
-        logger.info(f"No answer found in content: {content[:200]}...")
+        logger.info("No answer found in content: %.200s...", content)
         return None
     
     async def execute_tool(self, tool_call: Dict[str, Any], step: int = 0, yield_func=None) -> str:
-        """Execute a tool call and return the result"""
+        """Execute a tool call and return the result as indented JSON"""
+        result = await self._run_tool(tool_call, step, yield_func)
+        return self._encode_tool_result(result, indent=True)
+    
+    async def _run_tool(self, tool_call: Dict[str, Any], step: int = 0, yield_func=None) -> Any:
+        """Execute a tool call and return the handler's raw result, or an error message"""
         tool_name = tool_call.get("name")
         tool_args = tool_call.get("args", {})
         
@@ -799,29 +1178,118 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
         if not tool_args:
             tool_args = {k: v for k, v in tool_call.items() if k not in ["name", "args"]}
         
-        if tool_name not in self.tools:
+        handler = self.tools.get(tool_name)
+        if handler is None:
             return f"Error: Unknown tool '{tool_name}'"
         
+        if not isinstance(tool_args, dict):
+            return f"Error: Arguments for tool '{tool_name}' must be a JSON object"
+        
         try:
-            logger.info(f"DEBUG: Executing tool '{tool_name}' with args: {tool_args}")
+            # Serve repeated read-only calls from the tool result cache
+            cache_key = self._tool_cache_key(tool_name, tool_args)
+            cached = self._get_cached_tool_result(cache_key)
+            if cached is not None:
+                logger.info("DEBUG: Tool '%s' served from cache", tool_name)
+                return cached
+            
+            logger.info("DEBUG: Executing tool '%s' with args: %s", tool_name, tool_args)
             
             # Special handling for file_write to enable live streaming
+            # (copied, so the caller's tool call still compares equal to a fresh parse of the response)
             if tool_name == "file_write" and yield_func:
-                tool_args["step"] = step
-                tool_args["yield_func"] = yield_func
+                tool_args = {**tool_args, "step": step, "yield_func": yield_func}
             
-            result = await self.tools[tool_name](**tool_args)
-            logger.info(f"DEBUG: Tool '{tool_name}' returned result type: {type(result)}")
-            logger.info(f"DEBUG: Tool '{tool_name}' result keys: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}")
+            timeout = self.TOOL_TIMEOUTS.get(tool_name, self.DEFAULT_TOOL_TIMEOUT)
+            try:
+                result = await asyncio.wait_for(handler(**tool_args), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Tool '%s' timed out after %ss", tool_name, timeout)
+                return f"Error: {tool_name} timed out after {timeout}s"
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("DEBUG: Tool '%s' returned result type: %s", tool_name, type(result))
+                logger.info("DEBUG: Tool '%s' result keys: %s", tool_name, list(result.keys()) if isinstance(result, dict) else 'Not a dict')
             
-            json_result = json.dumps(result, indent=2)
-            logger.info(f"DEBUG: Tool '{tool_name}' JSON result length: {len(json_result)}")
-            return json_result
+            # Only cache successful results so errors can be retried
+            if cache_key is not None and self._is_cacheable_result(result):
+                self._store_tool_result(cache_key, tool_name, result)
+            return result
         except Exception as e:
-            logger.error(f"DEBUG: Tool execution error: {str(e)}")
-            logger.error(f"DEBUG: Tool: {tool_name}, Args: {tool_args}")
+            logger.error("DEBUG: Tool execution error: %s", e)
+            logger.error("DEBUG: Tool: %s, Args: %s", tool_name, tool_args)
             return f"Error executing {tool_name}: {str(e)}"
     
+    async def _run_tool_limited(self, tool_call: Dict[str, Any], step: int = 0, yield_func=None) -> Any:
+        """Run a tool call while holding one of the shared concurrent tool slots"""
+        # Before Python 3.10 a semaphore binds to the loop current at creation, so don't build it in __init__
+        if self._tool_semaphore is None:
+            self._tool_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_TOOLS)
+        async with self._tool_semaphore:
+            return await self._run_tool(tool_call, step, yield_func)
+    
+    def _encode_tool_result(self, result: Any, indent: bool = False) -> str:
+        """Serialize a raw tool result once; error messages and other scalars skip the encoder"""
+        if isinstance(result, str):
+            return result
+        if isinstance(result, _ATOMIC_TOOL_RESULT_TYPES):
+            return str(result)
+        option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2) if indent else orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(result, default=str, option=option).decode()
+    
+    def _tool_cache_key(self, tool_name: str, tool_args: Dict[str, Any]) -> Optional[str]:
+        """Build the result cache key for a read-only tool call, or None if it must not be cached"""
+        if tool_name not in self.TOOL_CACHE_TTLS:
+            return None
+        
+        try:
+            key = f"{tool_name}:{orjson.dumps(tool_args, option=orjson.OPT_SORT_KEYS).decode()}"
+        except (TypeError, ValueError):
+            return None
+        
+        # File reads are keyed on the file's mtime so edits invalidate the cached content
+        if tool_name == "file_read":
+            data_root = getattr(self.file_system_tools, "data_root", None)
+            if data_root is None:
+                return None
+            try:
+                key += f":{os.stat(os.path.join(data_root, str(tool_args.get('path', '')))).st_mtime_ns}"
+            except OSError:
+                return None
+        
+        return key
+    
+    def _get_cached_tool_result(self, cache_key: Optional[str]) -> Optional[Any]:
+        """Get a cached tool result if it has not expired"""
+        if cache_key is None:
+            return None
+        
+        entry = self._tool_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        expires_at, result = entry
+        if time.time() >= expires_at:
+            del self._tool_cache[cache_key]
+            return None
+        return result
+    
+    def _is_cacheable_result(self, result: Any) -> bool:
+        """Whether a tool result is free of errors, including failed entries such as unfetched case study pages"""
+        if not isinstance(result, dict):
+            return True
+        if result.get("error"):
+            return False
+        entries = result.get("results")
+        if isinstance(entries, list):
+            return not any(isinstance(entry, dict) and entry.get("type") == "case_study_error" for entry in entries)
+        return True
+    
+    def _store_tool_result(self, cache_key: str, tool_name: str, result: Any):
+        """Store a tool result, evicting the oldest entry when the cache is full"""
+        if len(self._tool_cache) >= self.TOOL_CACHE_MAX_ENTRIES:
+            self._tool_cache.pop(next(iter(self._tool_cache)))
+        self._tool_cache[cache_key] = (time.time() + self.TOOL_CACHE_TTLS[tool_name], result)
+    
     async def web_search_tool(self, query: str) -> Dict[str, Any]:
         """Web search tool implementation"""
         try:
@@ -849,7 +1317,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
     async def browser_automate_tool(self, user_request: str) -> Dict[str, Any]:
         """Browser automation tool using browser-use"""
         try:
-            logger.info(f"Starting browser automation: {user_request}")
+            logger.info("Starting browser automation: %s", user_request)
             
             # Run the automation
             result = await browser_automation.run_automation(user_request)
@@ -874,7 +1342,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 }
                 
         except Exception as e:
-            logger.error(f"Browser automation tool error: {str(e)}")
+            logger.error("Browser automation tool error: %s", e)
             return {
                 "tool": "browser_automate", 
                 "user_request": user_request,
@@ -884,21 +1352,20 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
     async def case_study_lookup_tool(self, query: str) -> Dict[str, Any]:
         """Case study lookup using web search WITH scraping - let LLM generate the query with site: filtering"""
         try:
-            logger.info(f"DEBUG: Starting case_study_lookup_tool with query: '{query}'")
+            logger.info("DEBUG: Starting case_study_lookup_tool with query: '%s'", query)
             
             # Parse the query to extract structured components for better search
             # Try to extract site: filter and context from the query
-            import re
-            site_match = re.search(r'site:([^\s]+)', query)
+            site_match = _SITE_FILTER_RE.search(query)
             rep_domain = site_match.group(1) if site_match else ""
             
             # Extract company name from quotes OR derive from rep_domain
-            company_match = re.search(r'"([^"]+)"', query)
+            company_match = _QUOTED_PHRASE_RE.search(query)
             if company_match:
                 company_name = company_match.group(1)
             elif rep_domain:
                 # Use the domain's root as the company name
-                company_name = rep_domain.split('.')[0]  # "bloomreach" from "bloomreach.com"
+                company_name = rep_domain.partition('.')[0]  # "bloomreach" from "bloomreach.com"
             else:
                 company_name = ""
             
@@ -910,19 +1377,20 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 context_query = context_query.replace(company_match.group(0), "").strip()
             context_query = context_query.replace("case study", "").strip()
             
-            logger.info(f"DEBUG: Parsed query - Company: '{company_name}', Context: '{context_query}', Rep domain: '{rep_domain}'")
+            logger.info("DEBUG: Parsed query - Company: '%s', Context: '%s', Rep domain: '%s'", company_name, context_query, rep_domain)
             
             # Always force case-studies path filtering for better results
-            search_queries = [
+            # (de-duplicated in order, so a fallback that repeats a targeted query isn't searched twice)
+            search_queries = list(dict.fromkeys([
                 f"{context_query} case study inurl:case-studies site:{rep_domain}",
                 f"{context_query} success story inurl:customer-stories site:{rep_domain}",
                 f"{context_query} customer story inurl:success-stories site:{rep_domain}",
                 f"{context_query} case study site:{rep_domain}/en/case-studies",
                 # Fallback to original query
                 query
-            ]
+            ]))
             
-            logger.info(f"DEBUG: Generated {len(search_queries)} targeted search queries with inurl filters")
+            logger.info("DEBUG: Generated %d targeted search queries with inurl filters", len(search_queries))
             
             all_results = []
             successful_queries = []
@@ -930,12 +1398,19 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
             # Try all search queries until we find case studies
             max_queries_to_try = len(search_queries)  # Try all queries
             
+            # Take results in query order with a bounded number of queries in flight, so an early hit saves the rest
+            # Use Brave Search only (no scraping) for speed and reliability
+            search_tasks = []
             for i, search_query in enumerate(search_queries[:max_queries_to_try]):
+                while len(search_tasks) < min(i + self.CASE_STUDY_SEARCHES_IN_FLIGHT, max_queries_to_try):
+                    search_tasks.append(asyncio.create_task(
+                        self.web_search_manager.brave_search.search(search_queries[len(search_tasks)], count=8)
+                    ))
+                
                 try:
-                    logger.info(f"DEBUG: Trying search query {i+1}/{max_queries_to_try}: '{search_query}'")
+                    logger.info("DEBUG: Trying search query %d/%s: '%s'", i + 1, max_queries_to_try, search_query)
                     
-                    # Use Brave Search only (no scraping) for speed and reliability
-                    result = await self.web_search_manager.brave_search.search(search_query, count=8)
+                    result = await search_tasks[i]
                     
                     if result.get("results"):
                         # Strict filtering: MUST have case-studies in URL AND must NOT have blog
@@ -944,144 +1419,58 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                             url = r.get("url", "").lower()
                             
                             # MUST have case-studies related paths
-                            has_case_studies = any(path in url for path in ["/case-studies/", "/customer-stories/", "/success-stories/", "case-study", "customer-story"])
+                            has_case_studies = _CASE_STUDY_URL_RE.search(url) is not None
                             
                             # MUST NOT have blog, news, or press paths
-                            has_excluded_paths = any(path in url for path in ["/blog/", "/news/", "/press/", "/articles/", "blog."])
+                            has_excluded_paths = _EXCLUDED_URL_RE.search(url) is not None
                             
                             if has_case_studies and not has_excluded_paths:
                                 filtered_results.append(r)
-                                logger.info(f"DEBUG: [ACCEPTED] case study URL: {url}")
+                                logger.info("DEBUG: [ACCEPTED] case study URL: %s", url)
                             else:
-                                logger.info(f"DEBUG: [REJECTED] URL: {url} (case_studies={has_case_studies}, excluded={has_excluded_paths})")
+                                logger.info("DEBUG: [REJECTED] URL: %s (case_studies=%s, excluded=%s)", url, has_case_studies, has_excluded_paths)
                         
                         if filtered_results:
                             # Found actual case studies, use these
                             all_results.extend(filtered_results)
                             successful_queries.append(search_query)
-                            logger.info(f"DEBUG: Query {i+1} returned {len(filtered_results)} valid case study URLs")
-                            logger.info(f"DEBUG: Found actual case studies, stopping search")
+                            logger.info("DEBUG: Query %d returned %d valid case study URLs", i + 1, len(filtered_results))
+                            logger.info("DEBUG: Found actual case studies, stopping search")
                             break
                         else:
-                            logger.info(f"DEBUG: Query {i+1} returned {len(result.get('results', []))} results but no valid case study URLs, continuing search")
+                            logger.info("DEBUG: Query %d returned %d results but no valid case study URLs, continuing search", i + 1, len(result.get('results', [])))
                     else:
-                        logger.info(f"DEBUG: Query {i+1} returned no results")
+                        logger.info("DEBUG: Query %d returned no results", i + 1)
                         
                 except Exception as query_error:
-                    logger.error(f"DEBUG: Error with query {i+1}: {str(query_error)}")
+                    logger.error("DEBUG: Error with query %d: %s", i + 1, query_error)
                     continue
             
-            # Remove duplicates based on URL
-            seen_urls = set()
-            unique_results = []
+            # A search still in flight isn't awaited further; drain it so its error isn't reported as unretrieved
+            self._cancel_tasks(search_tasks)
+            await asyncio.gather(*search_tasks, return_exceptions=True)
+            
+            # Remove duplicates based on URL, keeping the first result for each
+            results_by_url = {}
             for result in all_results:
-                url = result.get('url', '')
-                if url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_results.append(result)
+                results_by_url.setdefault(result.get('url', ''), result)
+            unique_results = list(results_by_url.values())
             
-            logger.info(f"DEBUG: Final results: {len(unique_results)} unique results from {len(successful_queries)} successful queries")
+            logger.info("DEBUG: Final results: %d unique results from %d successful queries", len(unique_results), len(successful_queries))
             
             # Log detailed information about each result
             for i, res in enumerate(unique_results):
-                logger.info(f"DEBUG: Result {i+1}:")
-                logger.info(f"  Title: {res.get('title', 'N/A')}")
-                logger.info(f"  URL: {res.get('url', 'N/A')}")
-                logger.info(f"  Description: {res.get('description', 'N/A')[:200]}...")
-                logger.info(f"  Type: {res.get('type', 'N/A')}")
-            
-            # Fetch actual case study content from the URLs
-            detailed_results = []
-            for result in unique_results[:3]:  # Limit to top 3 for performance
-                try:
-                    url = result.get("url", "")
-                    logger.info(f"DEBUG: Fetching content from {url}")
-                    
-                    # Fetch the actual page content
-                    import aiohttp
-                    import asyncio
-                    from bs4 import BeautifulSoup
-                    
-                    timeout = aiohttp.ClientTimeout(total=10)
-                    async with aiohttp.ClientSession(timeout=timeout) as session:
-                        async with session.get(url, headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}) as response:
-                            if response.status == 200:
-                                html_content = await response.text()
-                                soup = BeautifulSoup(html_content, 'html.parser')
-                                
-                                # Extract case study content
-                                case_study_content = self.extract_case_study_content(soup, url)
-                                
-                                if case_study_content:
-                                    detailed_results.append({
-                                        "title": result.get("title", ""),
-                                        "url": url,
-                                        "description": result.get("description", ""),
-                                        "content": case_study_content,
-                                        "type": "case_study"
-                                    })
-                                else:
-                                    # Create fallback content structure if extraction fails
-                                    fallback_content = {
-                                        "title": result.get("title", ""),
-                                        "company": None,
-                                        "challenge": "Content extraction failed - challenge details not available",
-                                        "solution": "Content extraction failed - solution details not available", 
-                                        "results": "Content extraction failed - results not available",
-                                        "full_content": result.get("description", "Limited description available"),
-                                        "key_metrics": []
-                                    }
-                                    detailed_results.append({
-                                        "title": result.get("title", ""),
-                                        "url": url,
-                                        "description": result.get("description", ""),
-                                        "content": fallback_content,
-                                        "type": "case_study_partial"
-                                    })
-                            else:
-                                logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
-                                # Create fallback for HTTP errors with clear error indication
-                                error_content = {
-                                    "title": result.get("title", ""),
-                                    "company": None,
-                                    "challenge": f"Unable to access case study - HTTP {response.status} error",
-                                    "solution": "Content unavailable due to access error",
-                                    "results": "Results unavailable due to access error", 
-                                    "full_content": result.get("description", "Limited description from search results"),
-                                    "key_metrics": [],
-                                    "access_error": f"HTTP {response.status}"
-                                }
-                                detailed_results.append({
-                                    "title": result.get("title", ""),
-                                    "url": url,
-                                    "description": result.get("description", ""),
-                                    "content": error_content,
-                                    "type": "case_study_error"
-                                })
-                                
-                except Exception as e:
-                    logger.error(f"Error fetching content from {url}: {str(e)}")
-                    # Create fallback for exceptions with clear error indication
-                    exception_content = {
-                        "title": result.get("title", ""),
-                        "company": None,
-                        "challenge": f"Unable to access case study - Network/parsing error: {str(e)[:100]}",
-                        "solution": "Content unavailable due to technical error",
-                        "results": "Results unavailable due to technical error", 
-                        "full_content": result.get("description", "Limited description from search results"),
-                        "key_metrics": [],
-                        "fetch_error": str(e)
-                    }
-                    detailed_results.append({
-                        "title": result.get("title", ""),
-                        "url": result.get("url", ""),
-                        "description": result.get("description", ""),
-                        "content": exception_content,
-                        "type": "case_study_error"
-                    })
-                    
-                # Add delay between requests to be respectful
-                await asyncio.sleep(0.5)
+                logger.info("DEBUG: Result %d:", i + 1)
+                logger.info("  Title: %s", res.get('title', 'N/A'))
+                logger.info("  URL: %s", res.get('url', 'N/A'))
+                logger.info("  Description: %.200s...", res.get('description', 'N/A'))
+                logger.info("  Type: %s", res.get('type', 'N/A'))
+            
+            # Fetch actual case study content from the URLs concurrently over the shared session
+            session = await self._get_http_session()
+            detailed_results = await asyncio.gather(
+                *(self._fetch_case_study(session, result) for result in unique_results[:3])  # Limit to top 3 for performance
+            )
 
             response = {
                 "tool": "case_study_lookup",
@@ -1095,17 +1484,125 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 "filtering": "strict_case_studies_only"
             }
             
-            logger.info(f"DEBUG: case_study_lookup_tool returning response with {response['total_found']} detailed results")
+            logger.info("DEBUG: case_study_lookup_tool returning response with %s detailed results", response['total_found'])
             return response
                 
         except Exception as e:
-            logger.error(f"DEBUG: case_study_lookup_tool error: {str(e)}")
+            logger.error("DEBUG: case_study_lookup_tool error: %s", e)
             return {
                 "tool": "case_study_lookup",
                 "query": query,
                 "error": str(e)
             }
 
+    async def _get_http_session(self):
+        """Return the shared HTTP session, so pooled connections and DNS lookups are reused across lookups"""
+        if self._http_session is None or self._http_session.closed:
+            import aiohttp
+            
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=self.MAX_FETCHES_PER_HOST, keepalive_timeout=30, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._http_session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+    
+    async def _fetch_case_study(self, session, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch and extract one case study page, falling back to the search result on errors"""
+        url = result.get("url", "")
+        try:
+            # Bound page fetches across concurrent lookups
+            # (created here rather than in __init__, since before Python 3.10 a semaphore binds to the loop current at creation)
+            if self._fetch_semaphore is None:
+                self._fetch_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+            async with self._fetch_semaphore:
+                logger.info("DEBUG: Fetching content from %s", url)
+                async with session.get(url, headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}) as response:
+                    if response.status != 200:
+                        logger.warning("Failed to fetch %s: HTTP %s", url, response.status)
+                        # Create fallback for HTTP errors with clear error indication
+                        error_content = {
+                            "title": result.get("title", ""),
+                            "company": None,
+                            "challenge": f"Unable to access case study - HTTP {response.status} error",
+                            "solution": "Content unavailable due to access error",
+                            "results": "Results unavailable due to access error", 
+                            "full_content": result.get("description", "Limited description from search results"),
+                            "key_metrics": [],
+                            "access_error": f"HTTP {response.status}"
+                        }
+                        return {
+                            "title": result.get("title", ""),
+                            "url": url,
+                            "description": result.get("description", ""),
+                            "content": error_content,
+                            "type": "case_study_error"
+                        }
+                    html_content = await response.text()
+            
+            # Parse and extract in a worker thread so other fetches keep progressing
+            case_study_content = await asyncio.get_running_loop().run_in_executor(None, self._parse_case_study_page, html_content, url)
+            
+            if case_study_content:
+                return {
+                    "title": result.get("title", ""),
+                    "url": url,
+                    "description": result.get("description", ""),
+                    "content": case_study_content,
+                    "type": "case_study"
+                }
+            
+            # Create fallback content structure if extraction fails
+            fallback_content = {
+                "title": result.get("title", ""),
+                "company": None,
+                "challenge": "Content extraction failed - challenge details not available",
+                "solution": "Content extraction failed - solution details not available", 
+                "results": "Content extraction failed - results not available",
+                "full_content": result.get("description", "Limited description available"),
+                "key_metrics": []
+            }
+            return {
+                "title": result.get("title", ""),
+                "url": url,
+                "description": result.get("description", ""),
+                "content": fallback_content,
+                "type": "case_study_partial"
+            }
+        
+        except Exception as e:
+            logger.error("Error fetching content from %s: %s", url, e)
+            # Create fallback for exceptions with clear error indication
+            exception_content = {
+                "title": result.get("title", ""),
+                "company": None,
+                "challenge": f"Unable to access case study - Network/parsing error: {str(e)[:100]}",
+                "solution": "Content unavailable due to technical error",
+                "results": "Results unavailable due to technical error", 
+                "full_content": result.get("description", "Limited description from search results"),
+                "key_metrics": [],
+                "fetch_error": str(e)
+            }
+            return {
+                "title": result.get("title", ""),
+                "url": url,
+                "description": result.get("description", ""),
+                "content": exception_content,
+                "type": "case_study_error"
+            }
+    
+    def _parse_case_study_page(self, html_content: str, url: str):
+        """Parse a fetched page and extract its case study content (CPU-bound, run off the event loop)"""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(html_content, 'lxml')  # lxml's C parser is several times faster than html.parser
+        return self.extract_case_study_content(soup, url)
+    
     def extract_case_study_content(self, soup, url):
         """Extract structured case study content from HTML"""
         try:
@@ -1124,23 +1621,18 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
             company = None
             if title:
                 # Try to extract company name from title patterns
-                company_patterns = [
-                    r'^([^:]+):', # "Company Name: Title"
-                    r'([^-]+)-', # "Company Name - Title"  
-                    r'(\w+(?:\s+\w+){0,2})\s+(?:Case Study|Success Story|Customer Story)', # "Company Name Case Study"
-                ]
-                for pattern in company_patterns:
-                    match = re.search(pattern, title, re.IGNORECASE)
+                for pattern in _COMPANY_TITLE_RES:
+                    match = pattern.search(title)
                     if match:
                         company = match.group(1).strip()
                         break
             content['company'] = company
             
             # Extract main content sections
-            main_content = ""
+            main_parts = []
             
             # Look for case study specific sections  
-            sections = soup.find_all(['div', 'section'], class_=re.compile(r'case-study|content|main|story'))
+            sections = soup.find_all(['div', 'section'], class_=_CASE_STUDY_SECTION_CLASS_RE)
             if not sections:
                 # Fallback to main content areas
                 sections = soup.find_all(['main', 'article', '.content', '.body'])
@@ -1153,12 +1645,15 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                     
                     text = section.get_text(separator=' ', strip=True)
                     if len(text) > 200:  # Only include substantial content
-                        main_content += text + " "
+                        main_parts.append(text)
+                        main_parts.append(" ")
+            main_content = "".join(main_parts)
             
-            # Extract specific challenge/solution/results if available
-            challenge = self.extract_section(soup, ['challenge', 'problem', 'situation'])
-            solution = self.extract_section(soup, ['solution', 'approach', 'implementation'])
-            results = self.extract_section(soup, ['results', 'outcome', 'benefits', 'impact'])
+            # Extract specific challenge/solution/results if available, sharing one scan of the headings
+            headings = [(heading, heading.get_text().lower()) for heading in soup.find_all(_HEADING_TAGS)]
+            challenge = self.extract_section(soup, ['challenge', 'problem', 'situation'], headings)
+            solution = self.extract_section(soup, ['solution', 'approach', 'implementation'], headings)
+            results = self.extract_section(soup, ['results', 'outcome', 'benefits', 'impact'], headings)
             
             content['challenge'] = challenge
             content['solution'] = solution  
@@ -1166,17 +1661,10 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
             content['full_content'] = main_content[:2000]  # Limit content length
             
             # Extract key metrics if available
-            metrics = []
-            metric_patterns = [
-                r'(\d+%)\s+(?:increase|improvement|growth|boost)',
-                r'(\d+x)\s+(?:increase|improvement|growth|boost)', 
-                r'(\$[\d,]+(?:\.\d+)?[kKmMbB]?)\s+(?:revenue|sales|savings)',
-                r'(\d+(?:,\d+)*)\s+(?:customers|users|leads|conversions)'
-            ]
-            
-            for pattern in metric_patterns:
-                matches = re.findall(pattern, main_content, re.IGNORECASE)
-                metrics.extend(matches)
+            metrics_by_kind = {kind: [] for kind in _METRIC_KINDS}
+            for match in _METRIC_RE.finditer(main_content):
+                metrics_by_kind[match.lastgroup].append(match.group(match.lastgroup))
+            metrics = [metric for kind in _METRIC_KINDS for metric in metrics_by_kind[kind]]
             
             content['key_metrics'] = metrics[:5]  # Limit to top 5 metrics
             
@@ -1187,30 +1675,38 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 return None
                 
         except Exception as e:
-            logger.error(f"Error extracting content from {url}: {str(e)}")
+            logger.error("Error extracting content from %s: %s", url, e)
             return None
     
-    def extract_section(self, soup, keywords):
+    def extract_section(self, soup, keywords, headings=None):
         """Extract specific sections based on keywords"""
         try:
+            # (heading, lowercased text) pairs; callers extracting several sections pass them in to scan once
+            if headings is None:
+                headings = [(heading, heading.get_text().lower()) for heading in soup.find_all(_HEADING_TAGS)]
             for keyword in keywords:
                 # Look for headings with keyword
-                for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                    if keyword.lower() in heading.get_text().lower():
+                keyword_lower = keyword.lower()
+                for heading, heading_text in headings:
+                    if keyword_lower in heading_text:
                         # Get the next sibling content
-                        content = ""
+                        texts = []
+                        content_length = 0  # Length including a separating space after each text
                         for sibling in heading.next_siblings:
                             if hasattr(sibling, 'name'):
-                                if sibling.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+                                if sibling.name in _HEADING_TAGS:
                                     break  # Stop at next heading
                                 text = sibling.get_text(strip=True)
                                 if text:
-                                    content += text + " "
-                        if len(content) > 50:
-                            return content.strip()[:500]  # Limit section length
+                                    texts.append(text)
+                                    content_length += len(text) + 1
+                                    if content_length > 500:
+                                        break  # Already past the section length limit
+                        if content_length > 50:
+                            return " ".join(texts)[:500]  # Limit section length
                             
                 # Look for divs/sections with keyword in class or id
-                for element in soup.find_all(['div', 'section'], attrs={'class': re.compile(keyword, re.I)}):
+                for element in soup.find_all(['div', 'section'], attrs={'class': _keyword_class_re(keyword)}):
                     text = element.get_text(strip=True)
                     if len(text) > 50:
                         return text[:500]
@@ -1222,12 +1718,12 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
     async def apollo_process_tool(self, csv_content: str, headless: bool = True, run_apify: bool = False) -> Dict[str, Any]:
         """Apollo processing tool implementation"""
         try:
-            logger.info(f"DEBUG: Starting apollo_process_tool with CSV content length: {len(csv_content)}")
+            logger.info("DEBUG: Starting apollo_process_tool with CSV content length: %d", len(csv_content))
             
             # Use the Apollo processing tool from web_search_manager
             result = await self.web_search_manager.apollo_tool.process_domains_csv(csv_content, headless, run_apify)
             
-            logger.info(f"DEBUG: Apollo processing result: {result}")
+            logger.info("DEBUG: Apollo processing result: %s", result)
             
             return {
                 "tool": "apollo_process",
@@ -1243,7 +1739,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
             }
             
         except Exception as e:
-            logger.error(f"DEBUG: apollo_process_tool error: {str(e)}")
+            logger.error("DEBUG: apollo_process_tool error: %s", e)
             return {
                 "tool": "apollo_process",
                 "success": False,
@@ -1281,30 +1777,34 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
             
             # Extract filename and file type for frontend preview
             filename = os.path.basename(path)
-            file_extension = filename.split('.')[-1].lower() if '.' in filename else 'txt'
+            file_extension = filename.rpartition('.')[2].lower() if '.' in filename else 'txt'
             
             # Send initial file creation thought card
             if yield_func:
-                yield_func(f"data: {json.dumps({'type': 'thought_card', 'card_type': 'file_writing', 'step': step, 'content': f'Creating {filename}...', 'file_path': path, 'file_type': file_extension, 'icon': '📝', 'title': 'File Creation'})}\n\n")
+                yield_func(_sse_frame({'type': 'thought_card', 'card_type': 'file_writing', 'step': step, 'content': f'Creating {filename}...', 'file_path': path, 'file_type': file_extension, 'icon': '📝', 'title': 'File Creation'}))
                 
                 # Send live writing content in chunks with typewriter effect
-                import asyncio
-                chunk_size = 100  # Characters per chunk
+                # Each frame carries only the new text and its offset, so clients append instead of resending the prefix
+                chunk_size = 1000  # Characters per chunk (the chat relay truncates card content at 1000)
+                # The card's constant fields are serialized once; each frame only fills in progress, offset and text
+                envelope = orjson.dumps({'type': 'thought_card', 'card_type': 'file_writing', 'step': step, 'file_path': path, 'filename': filename, 'file_type': file_extension, 'writing': True, 'icon': '📝', 'title': 'Writing File'})
+                frame_template = _SSE_PREFIX + envelope[:-1].replace(b'%', b'%%') + b',"progress":%d,"offset":%d,"content":%b}' + _SSE_SUFFIX
                 for i in range(0, len(content), chunk_size):
-                    chunk = content[:i + chunk_size]
                     progress = min(100, int((i + chunk_size) / len(content) * 100))
                     
-                    yield_func(f"data: {json.dumps({'type': 'thought_card', 'card_type': 'file_writing', 'step': step, 'content': chunk, 'file_path': path, 'filename': filename, 'file_type': file_extension, 'progress': progress, 'writing': True, 'icon': '📝', 'title': 'Writing File'})}\n\n")
+                    yield_func(frame_template % (progress, i, orjson.dumps(content[i:i + chunk_size])))
                     
                     # Small delay for typewriter effect
-                    await asyncio.sleep(0.05)
+                    await asyncio.sleep(0.02)
             
             # Actually write the file
             result = await self.file_system_tools.write_file(path, content, append=append)
+            # Rewriting an existing file changes its size without touching the directory mtime
+            self._file_context_cache = None
             
             # Send completion thought card
             if yield_func:
-                yield_func(f"data: {json.dumps({'type': 'thought_card', 'card_type': 'file_complete', 'step': step, 'content': content, 'file_path': path, 'filename': filename, 'file_type': file_extension, 'size': result.get('size', 0), 'writing': False, 'icon': '✅', 'title': 'File Complete'})}\n\n")
+                yield_func(_sse_frame({'type': 'thought_card', 'card_type': 'file_complete', 'step': step, 'content': content, 'file_path': path, 'filename': filename, 'file_type': file_extension, 'size': result.get('size', 0), 'writing': False, 'icon': '✅', 'title': 'File Complete'}))
             
             return {
                 "tool": "file_write",
@@ -1331,6 +1831,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 return {"tool": "file_edit", "path": path, "error": "File system tools not available"}
             
             result = await self.file_system_tools.edit_file(path, old_text, new_text)
+            self._file_context_cache = None
             return {
                 "tool": "file_edit",
                 "path": path,
@@ -1406,33 +1907,25 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 "directories": {}
             }
             
-            # Key directories to check
-            directories_to_check = [
-                ("", "Root"),
-                ("knowledge_base", "Knowledge Base"),
-                ("output", "Output"),
-                ("output/case_studies", "Case Studies"),
-                ("output/emails", "Email Drafts"),
-                ("output/slides", "Slides"),
-                ("output/context", "Context Files"),
-                ("logs", "Logs")
-            ]
+            # The listings are independent, so run them concurrently
+            results = await asyncio.gather(
+                *(self.file_system_tools.list_files(dir_path) for dir_path, _ in self.WORKSPACE_DIRECTORIES),
+                return_exceptions=True
+            )
             
-            for dir_path, dir_name in directories_to_check:
-                try:
-                    result = await self.file_system_tools.list_files(dir_path)
-                    if result.get("ok", False):
-                        overview["directories"][dir_name] = {
-                            "path": dir_path,
-                            "files": result.get("files", []),
-                            "subdirectories": result.get("directories", []),
-                            "total_files": result.get("total_files", 0)
-                        }
-                except Exception as e:
-                    logger.debug(f"Error listing {dir_path}: {str(e)}")
+            for (dir_path, dir_name), result in zip(self.WORKSPACE_DIRECTORIES, results):
+                if isinstance(result, Exception):
+                    logger.debug("Error listing %s: %s", dir_path, result)
                     overview["directories"][dir_name] = {
                         "path": dir_path,
-                        "error": str(e)
+                        "error": str(result)
+                    }
+                elif result.get("ok", False):
+                    overview["directories"][dir_name] = {
+                        "path": dir_path,
+                        "files": result.get("files", []),
+                        "subdirectories": result.get("directories", []),
+                        "total_files": result.get("total_files", 0)
                     }
             
             return overview
@@ -1443,56 +1936,82 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 "error": str(e)
             }
     
+    def _needs_file_context(self, messages: List[Dict[str, Any]]) -> bool:
+        """Check whether the latest user message mentions anything workspace-related"""
+        for msg in reversed(messages):
+            if msg.get("role") == "user":
+                return bool(_WORKSPACE_INTENT_RE.search(str(msg.get("content", ""))))
+        return True
+    
+    def _workspace_mtime_key(self) -> Optional[Tuple[int, ...]]:
+        """Get the mtimes of the directories shown in the file context, or None if unavailable"""
+        data_root = getattr(self.file_system_tools, "data_root", None)
+        if data_root is None:
+            return None
+        
+        mtimes = []
+        for dir_path, _ in self.WORKSPACE_DIRECTORIES:
+            try:
+                mtimes.append(os.stat(os.path.join(data_root, dir_path)).st_mtime_ns)
+            except OSError:
+                mtimes.append(0)
+        return tuple(mtimes)
+    
+    async def _get_cached_file_context(self) -> str:
+        """Get file listings for the system prompt, reusing them while the workspace is unchanged"""
+        cache = self._file_context_cache
+        now = time.monotonic()
+        # Right after a check, skip even the directory stats; the file tools clear the cache on writes
+        if cache and now - cache[1] < self.FILE_CONTEXT_TTL:
+            return cache[2]
+        
+        mtime_key = self._workspace_mtime_key()
+        if mtime_key is not None and cache and cache[0] == mtime_key:
+            self._file_context_cache = (mtime_key, now, cache[2])
+            return cache[2]
+        
+        file_context = await self._get_file_context()
+        if mtime_key is not None:
+            self._file_context_cache = (mtime_key, now, file_context)
+        return file_context
+    
     async def _get_file_context(self) -> str:
         """Get current file listings for the system prompt"""
         try:
             if not self.file_system_tools:
                 return "\nCURRENT WORKSPACE: File system tools not available."
             
-            # Get listings for key directories
-            directories_to_check = [
-                ("", "Root"),
-                ("knowledge_base", "Knowledge Base"),
-                ("output", "Output"),
-                ("output/case_studies", "Case Studies"),
-                ("output/emails", "Email Drafts"),
-                ("output/slides", "Slides"),
-                ("output/context", "Context Files"),
-                ("logs", "Logs")
-            ]
+            parts = ["\nCURRENT WORKSPACE FILES:\n"]
             
-            file_context = "\nCURRENT WORKSPACE FILES:\n"
+            results = await asyncio.gather(
+                *(self.file_system_tools.list_files(dir_path) for dir_path, _ in self.WORKSPACE_DIRECTORIES),
+                return_exceptions=True
+            )
             
-            for dir_path, dir_name in directories_to_check:
-                try:
-                    result = await self.file_system_tools.list_files(dir_path)
-                    if result.get("success"):
-                        files = result.get("files", [])
-                        if files:
-                            file_context += f"\n📁 {dir_name}:\n"
-                            # Show up to 10 files per directory
-                            for f in files[:10]:
-                                if f.get('type') == 'file':
-                                    size_kb = f.get('size', 0) / 1024
-                                    file_context += f"  📄 {f['name']} ({size_kb:.1f}KB)\n"
-                            
-                            if len(files) > 10:
-                                file_context += f"  ... and {len(files) - 10} more files\n"
-                except Exception as e:
-                    logger.debug(f"Error listing {dir_path}: {str(e)}")
+            for (dir_path, dir_name), result in zip(self.WORKSPACE_DIRECTORIES, results):
+                if isinstance(result, Exception):
+                    logger.debug("Error listing %s: %s", dir_path, result)
                     continue
+                if result.get("ok", False):
+                    files = result.get("files", [])
+                    if files:
+                        parts.append(f"\n📁 {dir_name}:\n")
+                        # Show up to 10 files per directory
+                        for f in files[:10]:
+                            if f.get('type') == 'file':
+                                # Size in tenths of a KB, rounded with integer math
+                                size_tenths_kb = (f.get('size', 0) * 10 + 512) >> 10
+                                parts.append(f"  📄 {f['name']} ({size_tenths_kb // 10}.{size_tenths_kb % 10}KB)\n")
+                        
+                        if len(files) > 10:
+                            parts.append(f"  ... and {len(files) - 10} more files\n")
             
-            file_context += "\nTo access files, use:\n"
-            file_context += "- file_read: Read specific files by path\n"
-            file_context += "- file_search: Find files by name (e.g., 'bloomreach', 'case study')\n"
-            file_context += "- file_write: Save new content to files\n"
-            file_context += "- file_list: List contents of specific directories (use path='' for root overview)\n"
-            file_context += "\nTIP: Start with file_list path='' to see the full workspace structure efficiently!\n"
+            parts.append(_FILE_CONTEXT_FOOTER)
             
-            return file_context
+            return "".join(parts)
             
         except Exception as e:
-            logger.error(f"Error getting file context: {str(e)}")
+            logger.error("Error getting file context: %s", e)
             return "\nCURRENT WORKSPACE: Error loading file context."
     
     async def email_write_tool(self, subject: str, content: str, to_email: str = "", path: str = "") -> Dict[str, Any]:
@@ -1500,9 +2019,8 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
         try:
             # Generate a path if not provided
             if not path:
-                import time
                 timestamp = int(time.time())
-                safe_subject = "".join(c for c in subject if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                safe_subject = _SUBJECT_UNSAFE_RE.sub('', subject).rstrip()
                 safe_subject = safe_subject.replace(' ', '_').lower()[:50]
                 path = f"output/emails/email_{safe_subject}_{timestamp}.md"
             
@@ -1523,11 +2041,22 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
             # Save the email draft
             if self.file_system_tools:
                 result = await self.file_system_tools.write_file(path, email_content)
+                self._file_context_cache = None
+                
+                # Don't send an email whose draft couldn't be saved
+                if not result.get("ok", False):
+                    return {
+                        "tool": "email_write",
+                        "path": path,
+                        "error": f"Error saving email draft: {result.get('error', 'Unknown error')}",
+                        "subject": subject,
+                        "content": content,
+                        "preview_content": email_content
+                    }
                 
                 # If to_email is provided, also send the email
                 if to_email and to_email.strip():
                     try:
-                        from gmail_service import email_service
                         send_result = await email_service.send_email(to_email, subject, content)
                         
                         if send_result["success"]:
@@ -1590,7 +2119,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 }
                 
         except Exception as e:
-            logger.error(f"Error in email_write_tool: {str(e)}")
+            logger.error("Error in email_write_tool: %s", e)
             return {
                 "tool": "email_write",
                 "error": f"Error creating email draft: {str(e)}",
@@ -1643,7 +2172,7 @@ COMPREHENSIVE research workflow: <think>I need to conduct detailed research on H
                 }
                 
         except Exception as e:
-            logger.error(f"Error in save_as_markdown_tool: {str(e)}")
+            logger.error("Error in save_as_markdown_tool: %s", e)
             return {
                 "tool": "save_as_markdown",
                 "company_domain": company_domain,
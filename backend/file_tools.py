@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from pathlib import Path
@@ -96,6 +97,10 @@ class FileSystemTools:
         Returns:
             Dictionary containing file listing
         """
+        return await asyncio.get_running_loop().run_in_executor(None, self._list_files_sync, path, include_hidden)
+    
+    def _list_files_sync(self, path: str = "", include_hidden: bool = False) -> Dict[str, Any]:
+        """List files and directories synchronously; run in a worker thread by list_files"""
         try:
             target_path = self._validate_path(path)
             
@@ -162,6 +167,10 @@ class FileSystemTools:
         Returns:
             Dictionary containing file contents
         """
+        return await asyncio.get_running_loop().run_in_executor(None, self._read_file_sync, path, encoding)
+    
+    def _read_file_sync(self, path: str, encoding: str = "utf-8") -> Dict[str, Any]:
+        """Read a file synchronously; run in a worker thread by read_file"""
         try:
             file_path = self._validate_path(path)
             
@@ -220,6 +229,10 @@ class FileSystemTools:
         Returns:
             Dictionary containing operation result
         """
+        return await asyncio.get_running_loop().run_in_executor(None, self._edit_file_sync, path, old_text, new_text, encoding)
+    
+    def _edit_file_sync(self, path: str, old_text: str, new_text: str, encoding: str = "utf-8") -> Dict[str, Any]:
+        """Edit a file synchronously; run in a worker thread by edit_file"""
         try:
             file_path = self._validate_path(path)
             
@@ -275,6 +288,10 @@ class FileSystemTools:
         Returns:
             Dictionary containing operation result
         """
+        return await asyncio.get_running_loop().run_in_executor(None, self._write_file_sync, path, content, encoding, append)
+    
+    def _write_file_sync(self, path: str, content: str, encoding: str = "utf-8", append: bool = False) -> Dict[str, Any]:
+        """Write a file synchronously; run in a worker thread by write_file"""
         try:
             file_path = self._validate_path(path)
             
@@ -373,6 +390,10 @@ class FileSystemTools:
         Returns:
             Dictionary containing search results
         """
+        return await asyncio.get_running_loop().run_in_executor(None, self._search_files_sync, query, path, file_extensions)
+    
+    def _search_files_sync(self, query: str, path: str = "", file_extensions: List[str] = None) -> Dict[str, Any]:
+        """Search files synchronously; run in a worker thread by search_files"""
         try:
             search_path = self._validate_path(path)
             
@@ -7,6 +7,7 @@ from typing import List, Dict, Any, Optional
 import os
 from dotenv import load_dotenv
 import json
+import orjson
 import logging
 import time
 from datetime import datetime
@@ -335,12 +336,14 @@ async def chat_endpoint(request: ChatRequest):
                 async for chunk in agent_mode.run_agent_loop_streaming(
                     messages, provider_manager
                 ):
-                    # Parse the streaming chunk
-                    if chunk.startswith("data: "):
+                    # Parse the streaming chunk (agent frames arrive as pre-encoded bytes)
+                    if chunk.startswith(b"data: "):
                         try:
-                            data = json.loads(chunk[6:])
+                            data = orjson.loads(chunk[6:])
 
                             if data.get("type") == "thought_card":
+                                # Tool results arrive already serialized to a string, so only slicing is needed
+                                result = data.get("result")
                                 # Send each thought card as individual tool call with simplified structure
                                 tool_call_data = {
                                     "toolCallId": f"thought_{thought_card_count}",
@@ -354,11 +357,16 @@ async def chat_endpoint(request: ChatRequest):
                                         "tool_name": data.get("tool_name"),
                                         "tool_args": data.get("tool_args"),
                                         # Limit result size to prevent huge JSON
-                                        "result": str(data.get("result", ""))[:2000] if data.get("result") else None,
+                                        "result": result[:2000] if result else None,
+                                        # How long the client should hold this card before showing the next
+                                        "display_delay_ms": data.get("display_delay_ms"),
+                                        # file_writing cards carry the next chunk of text at this offset
+                                        "offset": data.get("offset"),
+                                        "file_path": data.get("file_path"),
                                     },
                                 }
-                                chunk = f"9:{json.dumps(tool_call_data)}\n"
-                                logger.info(f"Sending thought card chunk: {len(chunk)} chars")
+                                chunk = b"9:" + orjson.dumps(tool_call_data) + b"\n"
+                                logger.info("Sending thought card chunk: %d chars", len(chunk))
                                 yield chunk
                                 thought_card_count += 1
 
@@ -369,20 +377,20 @@ async def chat_endpoint(request: ChatRequest):
                                 # Strip internal tags from final message before sending to user
                                 cleaned_message = strip_internal_tags(final_message)
                                 
-                                chunk = f"0:{json.dumps(cleaned_message)}\n"
-                                logger.info(f"Sending final message chunk: {chunk}")
+                                chunk = b"0:" + orjson.dumps(cleaned_message) + b"\n"
+                                logger.info("Sending final message chunk: %s", chunk)
                                 yield chunk
 
                             elif data.get("type") == "final_usage":
                                 final_usage = data["usage"]
 
-                        except json.JSONDecodeError:
-                            logger.error(f"Failed to parse streaming chunk: {chunk}")
+                        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
+                            logger.error("Failed to parse streaming chunk: %s", chunk)
                             continue
 
                 # Send completion signal
-                completion_chunk = f"d:\n"
-                logger.info(f"Sending completion chunk: {completion_chunk}")
+                completion_chunk = b"d:\n"
+                logger.info("Sending completion chunk: %s", completion_chunk)
                 yield completion_chunk
 
                 # Log completion
@@ -781,7 +789,7 @@ You can use multiple tools in a single response to complete complex tasks!
 """
 
         # Add system prompt to messages
-        chat_messages = [{"role": "system", "content": system_prompt}] + messages
+        chat_messages = [{"role": "system", "content": system_prompt}, *messages]
 
         # Get LLM response
         result = await provider_manager.get_completion(
@@ -846,9 +854,9 @@ def extract_tool_calls_from_response(content: str) -> List[Dict[str, Any]]:
 
     for match in matches:
         try:
-            tool_call = json.loads(match.strip())
+            tool_call = orjson.loads(match.strip())
             tool_calls.append(tool_call)
-        except json.JSONDecodeError:
+        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
             continue
 
     return tool_calls
@@ -1589,6 +1597,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     await browser_manager.stop()
+    await agent_mode.close()
+    await provider_manager.close()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 import os
+import asyncio
+import functools
+import threading
 import requests
-import json
-from typing import Dict, Any, Optional
+import orjson
+from typing import Dict, Any, Optional, AsyncGenerator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,10 +23,40 @@ class ProviderError(Exception):
     pass
 
 
+# requests.Session isn't documented as thread-safe, so each executor thread keeps its own pooled session
+_thread_sessions = threading.local()
+
+
+def _session_post(*args, **kwargs) -> requests.Response:
+    """POST through the calling thread's session, reusing its keep-alive connections"""
+    session = getattr(_thread_sessions, "session", None)
+    if session is None:
+        session = _thread_sessions.session = requests.Session()
+    return session.post(*args, **kwargs)
+
+
 class OpenAIProvider:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.base_url = "https://api.openai.com/v1"
+        self._stream_session = None  # aiohttp session for streamed completions, created on first stream
+
+    async def _get_stream_session(self):
+        """Return the shared aiohttp session, created inside the serving event loop"""
+        if self._stream_session is None or self._stream_session.closed:
+            import aiohttp
+
+            # Like requests' timeout=60: bound connecting and each read, not the whole stream
+            self._stream_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=60, sock_read=60)
+            )
+        return self._stream_session
+
+    async def close(self):
+        """Close the streaming session"""
+        if self._stream_session is not None:
+            await self._stream_session.close()
+            self._stream_session = None
 
     async def chat_completion(
         self, messages: list, model: str = "gpt-4-1106-preview"
@@ -73,11 +106,16 @@ class OpenAIProvider:
                     logger.info(f"Message {i} content: {msg.get('content', '')}")
             logger.info("=== END MESSAGES ===")
 
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60,
+            # requests is blocking, so run it off the event loop to let concurrent sessions overlap
+            response = await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(
+                    _session_post,
+                    f"{self.base_url}/chat/completions",
+                    headers=headers,
+                    data=orjson.dumps(payload),
+                    timeout=60,
+                ),
             )
 
             try:
@@ -123,6 +161,86 @@ class OpenAIProvider:
             raise ProviderError(f"OpenAI API error: {str(e)}")
 
 
+    async def stream_chat_completion(
+        self, messages: list, model: str = "gpt-4-1106-preview"
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a chat completion as {"content": delta} chunks followed by a {"usage": ...} chunk"""
+        try:
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}",
+            }
+
+            # Filter out any messages with 'tool' role to prevent OpenAI API errors
+            filtered_messages = [msg for msg in messages if msg.get("role") != "tool"]
+
+            payload = {
+                "model": model,
+                "messages": filtered_messages,
+                "temperature": 0.7,
+                "max_tokens": 2000,
+                "stream": True,
+                "stream_options": {"include_usage": True},
+            }
+
+            logger.info(
+                f"OpenAI API Streaming Request - Model: {model}, Message count: {len(filtered_messages)}"
+            )
+
+            # Read the stream with aiohttp, so waiting on the next line doesn't tie up an executor thread
+            session = await self._get_stream_session()
+            async with session.post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                data=orjson.dumps(payload),
+            ) as response:
+                if response.status >= 400:
+                    logger.error(f"OpenAI API HTTP Error: {response.status} {response.reason}")
+                    logger.error(f"Response text: {await response.text()}")
+                    raise Exception(f"OpenAI API error: {response.status} {response.reason}")
+
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if not line.startswith("data: "):
+                        continue
+
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+
+                    chunk = orjson.loads(data)
+                    if chunk.get("choices"):
+                        content = chunk["choices"][0].get("delta", {}).get("content")
+                        if content:
+                            yield {"content": content}
+
+                    usage = chunk.get("usage")
+                    if usage:
+                        prompt_tokens = usage["prompt_tokens"]
+                        completion_tokens = usage["completion_tokens"]
+
+                        # Calculate cost
+                        cost_key = f"openai:{model}"
+                        if cost_key in COST_RATES:
+                            rates = COST_RATES[cost_key]
+                            cost = (
+                                prompt_tokens * rates["input"] + completion_tokens * rates["output"]
+                            ) / 1000
+                        else:
+                            cost = 0.0
+
+                        yield {
+                            "usage": {
+                                "tokens_in": prompt_tokens,
+                                "tokens_out": completion_tokens,
+                                "cost_usd": cost,
+                            }
+                        }
+        except Exception as e:
+            logger.error(f"OpenAI API streaming error: {str(e)}")
+            raise ProviderError(f"OpenAI API error: {str(e)}")
+
+
 class AnthropicProvider:
     def __init__(self):
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -160,8 +278,16 @@ class AnthropicProvider:
             if system_message:
                 payload["system"] = system_message
 
-            response = requests.post(
-                f"{self.base_url}/messages", headers=headers, json=payload, timeout=60
+            # requests is blocking, so run it off the event loop to let concurrent sessions overlap
+            response = await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(
+                    _session_post,
+                    f"{self.base_url}/messages",
+                    headers=headers,
+                    data=orjson.dumps(payload),
+                    timeout=60,
+                ),
             )
 
             response.raise_for_status()
@@ -195,22 +321,50 @@ class ProviderManager:
     def __init__(self):
         self.providers = {"openai": OpenAIProvider(), "anthropic": AnthropicProvider()}
 
-    async def get_completion(
-        self, provider: str, messages: list, model: str = None
-    ) -> Dict[str, Any]:
-        logger.info(
-            f"ProviderManager.get_completion called with provider={provider}, model={model}"
-        )
+    async def close(self):
+        """Close provider sessions that hold open connections"""
+        for provider_instance in self.providers.values():
+            if hasattr(provider_instance, "close"):
+                await provider_instance.close()
 
+    def _resolve_provider(self, provider: str, model: Optional[str]):
         if provider not in self.providers:
             raise ProviderError(f"Unknown provider: {provider}")
 
-        provider_instance = self.providers[provider]
-
         # Use default model if not specified
         if model is None:
             model = "gpt-4o-mini" if provider == "openai" else "claude-3-haiku-20240307"
             logger.info(f"Using default model: {model} for provider: {provider}")
 
+        return self.providers[provider], model
+
+    async def get_completion(
+        self, provider: str, messages: list, model: str = None
+    ) -> Dict[str, Any]:
+        logger.info(
+            f"ProviderManager.get_completion called with provider={provider}, model={model}"
+        )
+
+        provider_instance, model = self._resolve_provider(provider, model)
+
         logger.info(f"Calling {provider} provider with model {model}")
         return await provider_instance.chat_completion(messages, model)
+
+    async def stream_completion(
+        self, provider: str, messages: list, model: str = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a completion as {"content": delta} chunks followed by a {"usage": ...} chunk"""
+        logger.info(
+            f"ProviderManager.stream_completion called with provider={provider}, model={model}"
+        )
+
+        provider_instance, model = self._resolve_provider(provider, model)
+
+        if hasattr(provider_instance, "stream_chat_completion"):
+            async for chunk in provider_instance.stream_chat_completion(messages, model):
+                yield chunk
+        else:
+            # Providers without streaming support deliver the whole response as one chunk
+            result = await provider_instance.chat_completion(messages, model)
+            yield {"content": result["message"]["content"]}
+            yield {"usage": result["usage"]}
@@ -6,6 +6,7 @@ import logging
 from urllib.parse import quote
 import time
 import asyncio
+import functools
 import subprocess
 
 logger = logging.getLogger(__name__)
@@ -385,11 +386,16 @@ class BraveSearchTool:
             
             logger.info(f"Brave Search: Searching for '{query}' (type: {search_type})")
             
-            response = requests.get(
-                endpoint,
-                headers=self.headers,
-                params=params,
-                timeout=30
+            # Run the blocking request in a worker thread so concurrent searches overlap
+            response = await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(
+                    requests.get,
+                    endpoint,
+                    headers=self.headers,
+                    params=params,
+                    timeout=30
+                )
             )
             
             response.raise_for_status()
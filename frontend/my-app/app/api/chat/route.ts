@@ -89,6 +89,8 @@ export async function POST(req: Request) {
       const stream = new ReadableStream({
         start(controller) {
           let buffer = '';
+          // One streaming decoder so multi-byte characters split across reads decode correctly
+          const decoder = new TextDecoder();
           let isClosed = false;
           
           const safeEnqueue = (data: Uint8Array) => {
@@ -125,7 +127,7 @@ export async function POST(req: Request) {
                   break;
                 }
                 
-                const chunk = new TextDecoder().decode(value);
+                const chunk = decoder.decode(value, { stream: true });
                 console.log('Raw chunk received:', chunk);
                 
                 // Add to buffer
@@ -144,6 +146,18 @@ export async function POST(req: Request) {
                     
                     // Send each complete line immediately
                     safeEnqueue(new TextEncoder().encode(line + '\n'));
+
+                    // Pace thought cards on the client; the backend no longer sleeps between them
+                    if (line.startsWith('9:')) {
+                      try {
+                        const delayMs = JSON.parse(line.slice(2)).args?.display_delay_ms;
+                        if (delayMs) {
+                          await new Promise(resolve => setTimeout(resolve, delayMs));
+                        }
+                      } catch (error) {
+                        console.error('Failed to read thought card delay:', error);
+                      }
+                    }
                   }
                 }
               }
@@ -24,9 +24,12 @@ interface StepManagerProps {
 const stepData: Map<number, StepData> = new Map();
 const stepListeners: Set<() => void> = new Set();
 let finalAnswer: string | null = null;
+// Chunks of files being written, keyed by step and path then by offset, so a re-rendered card isn't appended twice
+const fileWritingChunks: Map<string, Map<number, string>> = new Map();
 
 export const clearAllSteps = () => {
   stepData.clear();
+  fileWritingChunks.clear();
   finalAnswer = null;
   // Notify all listeners
   stepListeners.forEach(listener => listener());
@@ -68,6 +71,18 @@ export const addStepData = (step: number, cardType: string, data: any) => {
   stepListeners.forEach(listener => listener());
 };
 
+// Record a file_writing chunk and return the file text received so far
+export const addFileWritingChunk = (step: number, filePath: string, offset: number, content: string): string => {
+  const key = `${step}:${filePath}`;
+  const chunks = fileWritingChunks.get(key) || new Map<number, string>();
+  chunks.set(offset, content);
+  fileWritingChunks.set(key, chunks);
+  return Array.from(chunks.entries())
+    .sort(([a], [b]) => a - b)
+    .map(([, text]) => text)
+    .join('');
+};
+
 export const StepManager: FC<StepManagerProps> = () => {
   const [steps, setSteps] = useState<Map<number, StepData>>(new Map());
   const [currentFinalAnswer, setCurrentFinalAnswer] = useState<string | null>(null);
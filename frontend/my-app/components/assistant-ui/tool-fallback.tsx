@@ -3,7 +3,7 @@ import { CheckIcon, ChevronDownIcon, ChevronUpIcon } from "lucide-react";
 import { useState, useEffect } from "react";
 import { Button } from "../ui/button";
 import { ThoughtCard } from "./thought-card";
-import { addStepData, clearAllSteps, StepManager } from "./step-manager";
+import { addFileWritingChunk, addStepData, clearAllSteps, StepManager } from "./step-manager";
 import { EmailPreview } from "./email-preview";
 import { FilePreview } from "./file-preview";
 import { useThoughtCard } from "./thought-card-context";
@@ -100,6 +100,27 @@ export const ToolFallback: ToolCallContentPartComponent = ({
             thoughtCard.addStep(parsedCardData.content, undefined, 'complete');
             thoughtCard.complete();
             break;
+          case 'file_writing': {
+            if (parsedCardData.offset == null) {
+              thoughtCard.addStep(parsedCardData.content, parsedCardData.tool_name, 'step');
+              break;
+            }
+            // Writing frames carry only the next chunk of text at `offset`, so preview the text received so far
+            const filePath: string = parsedCardData.file_path || '';
+            const filename = filePath.split('/').pop() || filePath;
+            thoughtCard.updateFileWriting({
+              filename,
+              file_path: filePath,
+              file_type: filename.includes('.') ? filename.split('.').pop()?.toLowerCase() : 'txt',
+              content: addFileWritingChunk(parsedCardData.step, filePath, parsedCardData.offset, parsedCardData.content),
+              writing: true
+            });
+            break;
+          }
+          case 'file_complete':
+            thoughtCard.updateFileWriting((previous: any) => previous && { ...previous, writing: false });
+            thoughtCard.addStep(parsedCardData.content, parsedCardData.tool_name, 'step');
+            break;
           default:
             thoughtCard.addStep(parsedCardData.content, parsedCardData.tool_name, 'step');
         }